@@ -0,0 +1,87 @@
+"""
+Benchmarks the vectorized color path (`ColorSort.vectorized_colors`) against the apply-based
+`isin_refcolors` / `assign_f2_colors` path on a synthetic colors column.
+
+    python -m benchmarks.bench_colors --rows 1000000
+    python -m benchmarks.bench_colors --rows 1000000 --distinct 1000000   # high-cardinality column
+    python -m benchmarks.bench_colors --rows 200000 --unique               # every string distinct
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.colorsort import REFERENCE_COLORS
+from src.utils import ColorSort
+
+from .generators import synthetic_school_data
+
+SCHOOL_DATA_PATH = "data/school_data.csv"
+REFERENCE_COLORS_LOWER = {color.lower() for color in REFERENCE_COLORS}
+# * Appended to every run: the Unicode spaces of scraped HTML around (and inside) the separators,
+# * which the "str" dtype's regex engine does not treat as \s, and blank values
+PARITY_CASES = [
+    "Black\xa0& Gold", "Navy\u2003&\u2009White", "Red\u202f,\u3000Gold\x85", "Royal\xa0Blue & Gold",
+    "Scarlet\u200b& Gray", "\xa0&\xa0", " & ", "",
+]
+
+
+def synthetic_colors(rows: int, seed: int = 0, distinct: int | None = None, unique: bool = False) -> pd.Series:
+    """
+    Samples `rows` color strings from "data/school_data.csv" (with its missing values), which has
+    only about 200 distinct strings, or, with `distinct`, draws them from a pool of that many
+    generated strings (see `generators.synthetic_school_data`), for realistic cardinality.
+    With `unique`, a numbered third color is appended to every string, so no two rows repeat.
+    """
+
+    if distinct is not None:
+        colors = synthetic_school_data(rows, seed, distinct_colors=distinct)["colors"]
+    else:
+        sample = pd.read_csv(SCHOOL_DATA_PATH)["colors"].to_numpy(dtype=object)
+        rng = np.random.default_rng(seed)
+        colors = pd.Series(sample[rng.integers(0, len(sample), rows)], dtype=object)
+    if unique:
+        colors = colors + pd.Series([f", Color {i}" for i in range(rows)], index=colors.index, dtype=object)
+    return colors
+
+
+def apply_path(colors: pd.Series) -> tuple[pd.Series, pd.Series]:
+    colors = colors.dropna()
+    mask = colors.apply(lambda x: ColorSort.isin_refcolors(x, REFERENCE_COLORS_LOWER))
+    f2_colors = colors[mask].apply(lambda x: ColorSort.assign_f2_colors(x))
+    return mask, f2_colors
+
+
+def vectorized_path(colors: pd.Series) -> tuple[pd.Series, pd.Series]:
+    colors = colors.dropna()
+    columns = ColorSort.vectorized_colors(colors, REFERENCE_COLORS_LOWER)
+    return columns["isin_ref"], columns["f2_colors"][columns["isin_ref"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, help="draw from this many generated strings instead of school_data.csv")
+    parser.add_argument("--unique", action="store_true", help="make every color string distinct")
+    args = parser.parse_args()
+
+    colors = synthetic_colors(args.rows, distinct=args.distinct, unique=args.unique)
+    colors = pd.concat([colors, pd.Series(PARITY_CASES, dtype=object)], ignore_index=True)
+    print(f"{colors.nunique():,} distinct strings")
+    results = {}
+    for name, path in (("apply", apply_path), ("vectorized", vectorized_path)):
+        start = time.perf_counter()
+        results[name] = path(colors)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<11} {elapsed:8.3f} s {args.rows / elapsed:14,.0f} rows/s")
+
+    (mask_a, f2_a), (mask_v, f2_v) = results["apply"], results["vectorized"]
+    # * apply turns the None of blank strings into NaN; compare missing values as equal
+    f2_a, f2_v = (f2.astype(object).where(f2.notna(), None).tolist() for f2 in (f2_a, f2_v))
+    assert mask_a.equals(mask_v.astype(bool)) and f2_a == f2_v, "vectorized path disagrees with apply path"
+    print("parity: ok")
+
+
+if __name__ == "__main__":
+    main()
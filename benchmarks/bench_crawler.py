@@ -0,0 +1,47 @@
+"""
+Benchmarks the directory fetch engines against a local stand-in server with injected latency.
+
+    python -m benchmarks.bench_crawler --schools 455 --latency 0.05
+"""
+import argparse
+import asyncio
+import time
+
+from loguru import logger as log
+
+from src.crawler import CrawlScheduler, crawl_async
+from src.fetcher import fetch_all
+
+from .stub_server import StubDirectoryServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--schools", type=int, default=455)
+    parser.add_argument("--latency", type=float, default=0.05, help="injected per-request latency in seconds")
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every n-th request with 503")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    args = parser.parse_args()
+
+    log.remove()
+    school_names = [f"School {i}" for i in range(args.schools)]
+
+    with StubDirectoryServer(school_names, latency=args.latency, fail_every=args.fail_every) as server:
+        print(f"{'engine':<10} {'conc':>5} {'pages/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'retries':>8} {'wall s':>8}")
+
+        for concurrency in args.concurrency:
+            start = time.perf_counter()
+            fetch_all(school_names, url=server.url, workers=concurrency)
+            wall = time.perf_counter() - start
+            print(f"{'threads':<10} {concurrency:>5} {args.schools / wall:>9.1f} {'':>8} {'':>8} {'':>8} {'':>8} {wall:>8.2f}")
+
+            scheduler = CrawlScheduler(url=server.url, concurrency=concurrency, rate=10_000, backoff_base=0.05)
+            start = time.perf_counter()
+            asyncio.run(crawl_async(school_names, scheduler))
+            wall = time.perf_counter() - start
+            s = scheduler.stats.summary()
+            print(f"{'asyncio':<10} {concurrency:>5} {s['pages_per_sec']:>9.1f} {s['p50_ms']:>8} {s['p90_ms']:>8} {s['p99_ms']:>8} {s['retries']:>8} {wall:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
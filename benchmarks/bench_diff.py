@@ -0,0 +1,81 @@
+"""
+Benchmarks the diff implementations of `ColorSort` on synthetic school tables: the old
+outer-merge diff, the hashed anti-join (`get_diff_df`) and the mask diff (`diff_from_mask`).
+Reports wall time and peak traced memory (tracemalloc) for each size.
+
+    python -m benchmarks.bench_diff --sizes 100000 1000000 10000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.utils import ColorSort
+
+SCHOOL_DATA_PATH = "data/school_data.csv"
+COLUMNS = ["school_name", "address", "mascot", "colors"]
+
+
+def synthetic_schools(rows: int, duplicates: float = 0.01, seed: int = 0) -> pd.DataFrame:
+    """
+    Samples `rows` records from "data/school_data.csv", making school names unique with a
+    numeric suffix except for a `duplicates` fraction of exact duplicate rows.
+    """
+
+    base = pd.read_csv(SCHOOL_DATA_PATH)[COLUMNS]
+    rng = np.random.default_rng(seed)
+    df = base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True)
+    ids = np.arange(rows)
+    copies = rng.random(rows) < duplicates
+    ids[copies] = rng.integers(0, rows, copies.sum())
+    df["school_name"] = df["school_name"] + " #" + pd.Series(ids).astype(str)
+    return df
+
+
+def merge_diff(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
+    # the implementation `get_diff_df` replaced
+    return df1.merge(df2, how='outer', indicator=True).query('_merge == "left_only"').drop(columns=['_merge'])
+
+
+def measure(function, *args) -> tuple[pd.DataFrame, float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--keep", type=float, default=0.9, help="fraction of rows the filter keeps")
+    parser.add_argument("--merge-limit", type=int, default=10_000_000, help="skip the merge diff above this size")
+    args = parser.parse_args()
+
+    print(f"{'rows':>11} {'method':<8} {'time':>10} {'peak':>11} {'diff rows':>11}")
+    for rows in args.sizes:
+        df1 = synthetic_schools(rows)
+        mask = np.random.default_rng(1).random(rows) < args.keep
+        df2 = df1[mask].reset_index(drop=True)
+
+        methods = [("hash", ColorSort.get_diff_df, (df1, df2)), ("mask", ColorSort.diff_from_mask, (df1, mask))]
+        if rows <= args.merge_limit:
+            methods.insert(0, ("merge", merge_diff, (df1, df2)))
+
+        results = {}
+        for name, function, function_args in methods:
+            results[name], elapsed, peak = measure(function, *function_args)
+            print(f"{rows:>11,} {name:<8} {elapsed:8.3f} s {peak:8.1f} MiB {len(results[name]):>11,}")
+
+        # * The mask diff is exact; the anti-join must return the same multiset of rows
+        # * (which copy of a duplicate it returns may differ)
+        hashed, masked = (results[name].sort_values(COLUMNS).reset_index(drop=True) for name in ("hash", "mask"))
+        assert hashed.equals(masked), "hash diff disagrees with mask diff"
+
+
+if __name__ == "__main__":
+    main()
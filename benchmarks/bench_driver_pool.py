@@ -0,0 +1,46 @@
+"""
+Benchmarks the Selenium driver pool against a local static page that imitates the
+`#edit-dropdown` form. Requires Chrome.
+
+    python -m benchmarks.bench_driver_pool --schools 120 --workers 1 2 4
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger as log
+
+from src.driver_pool import run_driver_pool
+
+from .stub_server import write_static_form
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--schools", type=int, default=120)
+    parser.add_argument("--delay-ms", type=int, default=50, help="delay before the table renders")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--recycle-after", type=int, default=50)
+    args = parser.parse_args()
+
+    log.remove()
+    school_names = [f"School {i}" for i in range(args.schools)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = write_static_form(str(Path(tmp) / "directory.html"), school_names, args.delay_ms)
+
+        baseline = None
+        print(f"{'workers':>7} {'wall s':>8} {'pages/s':>9} {'speedup':>8} {'issues':>7}")
+        for workers in args.workers:
+            start = time.perf_counter()
+            df = run_driver_pool(school_names, workers=workers, recycle_after=args.recycle_after, url=url, output_path=None)
+            wall = time.perf_counter() - start
+            baseline = baseline or wall
+            issues = int(df["issue"].notna().sum()) if "issue" in df else 0
+            assert df["school_name"].tolist() == school_names or issues, "pool output is out of order"
+            print(f"{workers:>7} {wall:>8.2f} {args.schools / wall:>9.1f} {baseline / wall:>8.2f} {issues:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Microbenchmark of the directory table parsers: `get_data` (BeautifulSoup, html.parser) against
+`get_data_fast` (lxml, single pass). Checks that both agree on every table of the (compact)
+corpus, and that `get_data_fast` reads the pretty-printed "data/table.html" correctly, where
+`get_data` does not (see the `get_data_fast` docstring).
+
+    python -m benchmarks.bench_parser --repeat 20
+"""
+import argparse
+import re
+import time
+
+from bs4 import BeautifulSoup
+from loguru import logger as log
+
+from src.scraper import get_data, get_data_fast
+
+TABLE_PATH = "data/table.html"
+# * What "data/table.html" holds, as written, for the check on the raw (pretty-printed) fixture
+RAW_EXPECTED = {
+    "school_name": "Alcovy High School",
+    "address": "14567 Highway 36 Covington, GA 30014",
+    "mascot": "Tigers",
+    "colors": "Black & Safety Gold",
+}
+
+
+def compact(html: str) -> str:
+    """
+    Removes the pretty-printing whitespace around tags, as in the live directory markup.
+    """
+
+    return re.sub(r"\s+<", "<", re.sub(r">\s+", ">", html))
+
+
+def make_corpus() -> list[str]:
+    """
+    Builds table variants from "data/table.html": the table itself, without the Colors row,
+    without the Mascot row, with a three-line address, and without personnel.
+    """
+
+    base = compact(open(TABLE_PATH, encoding="utf-8").read())
+    colors_row = re.search(r"<tr><td colspan=\"2\">Colors:[^<]*</td></tr>", base).group(0)
+    mascot_row = re.search(r"<tr><td colspan=\"2\">Mascot:[^<]*</td></tr>", base).group(0)
+    address_row = re.search(r"<tr><td colspan=\"2\">14567 Highway 36</td></tr>", base).group(0)
+    personnel = re.search(r"<tr><td align=\"center\" colspan=\"5\"><table>.*</table></td></tr>", base).group(0)
+
+    return [
+        base,
+        base.replace(colors_row, ""),
+        base.replace(mascot_row, ""),
+        base.replace(address_row, address_row + '<tr><td colspan="2">Suite 200</td></tr>'),
+        base.replace(personnel, ""),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    log.remove()
+    corpus = make_corpus()
+
+    for html in corpus:
+        expected = get_data(BeautifulSoup(html, "html.parser"))
+        actual = get_data_fast(html).as_dict()
+        assert actual == expected, f"parity mismatch:\n{expected}\n{actual}"
+    print(f"parity: {len(corpus)} tables match")
+
+    # * the intended difference: on indented markup only the fast parser finds the Colors and Mascot rows
+    raw = open(TABLE_PATH, encoding="utf-8").read()
+    actual = get_data_fast(raw).as_dict()
+    assert actual == RAW_EXPECTED, f"raw fixture mismatch:\n{RAW_EXPECTED}\n{actual}"
+    legacy = get_data(BeautifulSoup(raw, "html.parser"))
+    differs = sorted(key for key in RAW_EXPECTED if legacy[key] != actual[key])
+    print(f"raw fixture: get_data_fast ok (get_data differs on {', '.join(differs) or 'nothing'})")
+
+    for name, parse in (
+        ("get_data (bs4)", lambda html: get_data(BeautifulSoup(html, "html.parser"))),
+        ("get_data_fast (lxml)", get_data_fast),
+    ):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for html in corpus:
+                parse(html)
+        elapsed = time.perf_counter() - start
+        tables = args.repeat * len(corpus)
+        print(f"{name:<22} {elapsed / tables * 1000:8.3f} ms/table {tables / elapsed:10.1f} tables/s")
+
+
+if __name__ == "__main__":
+    main()
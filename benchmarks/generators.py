@@ -0,0 +1,153 @@
+"""
+Seeded generators of synthetic inputs for the benchmarks: directory tables shaped like
+`data/table.html` and `school_data` CSVs with realistic color-string noise.
+The same seed always produces the same data, so runs on different commits are comparable.
+"""
+import html
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.colorsort import REFERENCE_COLORS
+
+# * Sorted, so the seeded draws do not depend on the iteration order of the set
+REFERENCE_POOL = sorted(REFERENCE_COLORS)
+# * Off-list spellings as they appear in the real directory
+NOISE_COLORS = [
+    "Safety Gold", "University Red", "Emerald Green", "Grey", "Navy Blue", "Royal", "Garnet",
+    "Kelley Green", "Athletic Gold", "Cardinal Red", "Columbia blue", "Hot Pink", "Wine",
+]
+# * Colors are weighted like the directory: a few school colors dominate
+COMMON_COLORS = ["Black", "White", "Red", "Gold", "Blue", "Royal Blue", "Green", "Maroon", "Navy", "Orange", "Purple", "Silver", "Gray"]
+SEPARATORS = [" & ", ", ", " and ", "/", " &", ",  "]
+MASCOTS = ["Tigers", "Eagles", "Panthers", "Bulldogs", "Wildcats", "Lions", "Knights", "Hornets", "Rams", "Yellow Jackets"]
+CITIES = ["Atlanta", "Macon", "Savannah", "Augusta", "Columbus", "Athens", "Covington", "Valdosta", "Rome", "Dalton"]
+STREETS = ["Main Street", "Highway 36", "School Road", "Eagle Drive", "College Avenue", "Panther Way"]
+FIRST_NAMES = ["Patrick", "Gina", "Ron", "Taylor", "Justin", "Ken", "Kristopher", "Maria", "Alicia", "D'Lonzo"]
+LAST_NAMES = ["Carter", "Clark", "Edwards", "Jackson", "Hunter", "Williams", "Harris", "Brown", "Lee", "Moore"]
+ROLES = ["Principal", "Assistant Principal", "Athletic Director", "Football Coach", "Head Girls Basketball Coach", "Boys Basketball Coach"]
+
+
+def color_string(rng: np.random.Generator, noise: float = 0.1) -> str | None:
+    """
+    Draws one raw colors value: two (sometimes one or three) colors joined by a random separator.
+    With probability `noise` a color is an off-list spelling, a lowercased / padded variant, or
+    the value is missing altogether (None, or blank as from an empty "Colors:" row).
+    """
+
+    if rng.random() < noise / 10:
+        return None if rng.random() < 0.8 else str(rng.choice(["", " & "]))
+
+    count = rng.choice([1, 2, 3], p=[0.05, 0.8, 0.15])
+    colors = []
+    for _ in range(count):
+        pool = NOISE_COLORS if rng.random() < noise else (COMMON_COLORS if rng.random() < 0.7 else REFERENCE_POOL)
+        color = str(rng.choice(pool))
+        if rng.random() < noise / 2:
+            color = color.lower() if rng.random() < 0.5 else f" {color} "
+        colors.append(color)
+
+    separator = str(rng.choice(SEPARATORS, p=[0.6, 0.2, 0.08, 0.06, 0.03, 0.03]))
+    if len(colors) == 3 and separator == " & ":
+        return f"{colors[0]}, {colors[1]} & {colors[2]}"
+    return separator.join(colors)
+
+
+def synthetic_table(rng: np.random.Generator, index: int, noise: float = 0.1) -> str:
+    """
+    Builds one `.directory-table` in the compact live markup, shaped like `data/table.html`:
+    a heading, one to three address rows, optional Colors and Mascot rows, email and website,
+    contact numbers, and a personnel table of zero to twelve people.
+    """
+
+    def row(text: str) -> str:
+        return f'<tr><td colspan="2">{text}</td></tr>'
+
+    name = f"{rng.choice(CITIES)} High School {index}"
+    rows = [f'<tr><td align="center" class="directory-bar" colspan="5"><strong>{name} (8-AAAAA)</strong></td></tr>']
+    rows.append(row(f"{rng.integers(10, 99999)} {rng.choice(STREETS)}"))
+    if rng.random() < 0.2:
+        rows.append(row(f"Suite {rng.integers(100, 999)}"))
+    rows.append(row(f"{rng.choice(CITIES)}, GA {rng.integers(30000, 31999)}"))
+
+    colors = color_string(rng, noise)
+    if colors is not None:
+        rows.append(row(f"Colors: {html.escape(colors)}"))
+    if rng.random() > noise / 2:
+        rows.append(row(f"Mascot: {rng.choice(MASCOTS)}"))
+
+    email = f"office{index}@school{index % 97}.k12.ga.us"
+    rows.append(row(f'Email: <a href="mailto:{email}">{email}</a>'))
+    rows.append(row(f'<a href="http://www.school{index}.example.org">School Website</a>'))
+    rows.append('<tr><td colspan="5"></td></tr>')
+    rows.append('<tr><td align="center" class="directory-bar" colspan="5">Contact Numbers</td></tr>')
+    for label in ("Phone:", "BD Phone:", "Fax:"):
+        rows.append(f'<tr><td width="70">{label}</td><td>{rng.integers(200, 999)}-{rng.integers(200, 999)}-{rng.integers(1000, 9999)}</td></tr>')
+
+    people = int(rng.integers(0, 13))
+    if people:
+        pairs = []
+        for i in range(0, people, 2):
+            cells = []
+            for _ in range(min(2, people - i)):
+                person = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+                roles = "".join(f"<li>{role}</li>" for role in rng.choice(ROLES, size=rng.integers(1, 3), replace=False))
+                cells.append(f'<td align="left">{html.escape(person)}</td><td align="left"><ul>{roles}</ul></td>')
+            spacer = '<td width="15"></td><td style="padding: 1px; background-color: #CCCCCC;"></td><td width="15"></td>'
+            pairs.append(f'<tr class="{"odd" if i % 4 == 0 else "even"}">{spacer.join(cells)}</tr>')
+        rows.append('<tr><td colspan="5"></td></tr>')
+        rows.append('<tr><td align="center" class="directory-bar" colspan="5">Personnel</td></tr>')
+        rows.append(f'<tr><td align="center" colspan="5"><table><tbody>{"".join(pairs)}</tbody></table></td></tr>')
+
+    return f'<table cellpadding="2" cellspacing="2" class="directory-table" width="100%"><tbody>{"".join(rows)}</tbody></table>'
+
+
+def synthetic_tables(count: int, seed: int = 0, noise: float = 0.1) -> list[str]:
+    """
+    Builds `count` synthetic directory tables (see `synthetic_table`).
+    """
+
+    rng = np.random.default_rng(seed)
+    return [synthetic_table(rng, index, noise) for index in range(count)]
+
+
+def synthetic_school_data(rows: int, seed: int = 0, noise: float = 0.1, distinct_colors: int = 5000, first_id: int = 0) -> pd.DataFrame:
+    """
+    Builds a `school_data` frame (school_name, address, mascot, colors) of `rows` rows.
+    The colors are drawn from a pool of `distinct_colors` noisy values (see `color_string`) with a
+    Zipf-like skew, so, as in the real directory, a few strings account for most rows.
+    Generation is vectorized, so 10M rows take seconds rather than minutes. School names are
+    numbered from `first_id`.
+    """
+
+    rng = np.random.default_rng(seed)
+    pool = np.array([color_string(rng, noise) for _ in range(distinct_colors)], dtype=object)
+    weights = 1.0 / np.arange(1, distinct_colors + 1)
+    colors = pool[rng.choice(distinct_colors, size=rows, p=weights / weights.sum())]
+
+    ids = np.arange(first_id, first_id + rows).astype(str)
+    cities = np.array(CITIES, dtype=object)[rng.integers(0, len(CITIES), rows)]
+    streets = np.array(STREETS, dtype=object)[rng.integers(0, len(STREETS), rows)]
+    numbers = rng.integers(10, 99999, rows).astype(str)
+    zips = rng.integers(30000, 31999, rows).astype(str)
+
+    return pd.DataFrame({
+        "school_name": pd.Series(cities + " High School " + ids, dtype=object),
+        "address": pd.Series(numbers + " " + streets + " " + cities + ", GA " + zips, dtype=object),
+        "mascot": pd.Series(np.array(MASCOTS, dtype=object)[rng.integers(0, len(MASCOTS), rows)], dtype=object),
+        "colors": pd.Series(colors, dtype=object),
+    })
+
+
+def write_school_data(path: str, rows: int, seed: int = 0, noise: float = 0.1, chunk_rows: int = 1_000_000) -> str:
+    """
+    Writes a synthetic `school_data` CSV of `rows` rows, `chunk_rows` at a time so that 10M-row
+    files do not have to fit in memory. Returns `path`.
+    """
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    for start in range(0, max(rows, 1), chunk_rows):
+        chunk = synthetic_school_data(min(chunk_rows, rows - start), seed + start, noise, first_id=start)
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    return path
@@ -0,0 +1,306 @@
+"""
+Benchmark suite for the parser, every `ColorSort` stage and the end-to-end `colorsort.main`,
+on seeded synthetic inputs (see `benchmarks.generators`).
+Each result (best-of-`--repeat` wall time, rows/s and tracemalloc peak memory) is appended to
+`benchmarks/history.jsonl` together with the commit it ran on, and compared with the previous
+result of the same case and size, so a PR can be checked for throughput and memory regressions.
+
+    python -m benchmarks.run --sizes 1000 100000
+    python -m benchmarks.run --sizes 10000000 --cases "ColorSort.vectorized_colors" "colorsort.main"
+    python -m benchmarks.run --fail-on-regression 10
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import matplotlib
+
+matplotlib.use("Agg")  # plot_color_combos must not open windows
+
+import matplotlib.pyplot as plt
+import numpy as np
+from bs4 import BeautifulSoup
+from loguru import logger as log
+
+from src import colorsort
+from src.colorsort import REFERENCE_COLORS
+from src.scraper import get_data, get_data_fast
+from src.store import SchoolStore
+from src.plotting import render_thresholds
+from src.utils import ColorSort
+
+from .generators import synthetic_school_data, synthetic_tables, write_school_data
+
+HISTORY_PATH = "benchmarks/history.jsonl"
+REFERENCE_COLORS_LOWER = {color.lower() for color in REFERENCE_COLORS}
+
+
+class Inputs:
+    """
+    Lazily built, shared inputs for one size, so each is generated once for all the cases.
+    """
+
+    def __init__(self, rows: int, tables: int, workdir: Path):
+        self.rows = rows
+        self.tables_count = tables
+        self.workdir = workdir
+        self.cache = {}
+
+    def get(self, name: str, build: Callable):
+        if name not in self.cache:
+            self.cache[name] = build()
+        return self.cache[name]
+
+    @property
+    def tables(self) -> list[str]:
+        return self.get("tables", lambda: synthetic_tables(self.tables_count))
+
+    @property
+    def df(self):
+        return self.get("df", lambda: synthetic_school_data(self.rows).dropna(subset=['colors']).reset_index(drop=True))
+
+    @property
+    def color_columns(self):
+        return self.get("color_columns", lambda: ColorSort.vectorized_colors(self.df['colors'], REFERENCE_COLORS_LOWER))
+
+    @property
+    def mask(self) -> np.ndarray:
+        return self.color_columns['isin_ref'].to_numpy()
+
+    @property
+    def df2(self):
+        def build():
+            df2 = self.df[self.mask].reset_index(drop=True)
+            df2["f2_colors"] = self.color_columns['f2_colors'].to_numpy()[self.mask]
+            return df2
+        return self.get("df2", build)
+
+    @property
+    def group_folder(self) -> str:
+        def build():
+            folder = self.workdir / "groups" / "grouped"
+            folder.mkdir(parents=True, exist_ok=True)
+            with quiet():
+                ColorSort.group_by_f2_colors(self.df2, str(folder))
+            return str(folder)
+        return self.get("group_folder", build)
+
+    @property
+    def dataset(self) -> str:
+        def build():
+            path = str(self.workdir / "dataset.parquet")
+            with quiet():
+                ColorSort.write_group_dataset(self.df2, path)
+            return path
+        return self.get("dataset", build)
+
+    @property
+    def grouped_df(self):
+        return self.get("grouped_df", lambda: ColorSort.read_group_data(self.group_folder))
+
+
+@contextmanager
+def quiet():
+    # the ColorSort stages print progress; keep the benchmark table readable
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+
+
+def run_main(inputs: Inputs) -> None:
+    # colorsort.main reads and writes under ./data, so run it inside a scratch directory
+    root = inputs.workdir / "main"
+    csv = root / "data" / "school_data.csv"
+    if not csv.exists():
+        write_school_data(str(csv), inputs.rows)
+    (root / "data" / "grouped_data3").mkdir(parents=True, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        colorsort.main()
+    finally:
+        os.chdir(cwd)
+        plt.close("all")
+
+
+def write_store(inputs: Inputs) -> None:
+    # the synthetic colors include blank values, which pass the filter without a group
+    with SchoolStore(str(inputs.workdir / "schools.sqlite")) as store:
+        store.write_schools(inputs.df, REFERENCE_COLORS_LOWER, color_columns=inputs.color_columns)
+        store.refresh_group_counts()
+
+
+def plot(inputs: Inputs) -> None:
+    df_final, df_below = ColorSort.get_color_combos(inputs.grouped_df, threshold=10)
+    ColorSort.plot_color_combos(df_final, df_below)
+    plt.close("all")
+
+
+def update_groups(inputs: Inputs) -> None:
+    # rewrite the ten largest groups, as an incremental run that touched them would
+    colors = set(inputs.df2['f2_colors'].value_counts().index[:10])
+    ColorSort.update_groups(inputs.df2, inputs.group_folder, colors)
+
+
+# * case name -> (function of the inputs, what "rows" counts for the throughput)
+CASES: dict[str, tuple[Callable[[Inputs], object], str]] = {
+    "scraper.get_data": (lambda i: [get_data(BeautifulSoup(html, "html.parser")) for html in i.tables], "tables"),
+    "scraper.get_data_fast": (lambda i: [get_data_fast(html) for html in i.tables], "tables"),
+    "ColorSort.isin_refcolors": (lambda i: i.df['colors'].apply(lambda x: ColorSort.isin_refcolors(x, REFERENCE_COLORS_LOWER)), "rows"),
+    "ColorSort.assign_f2_colors": (lambda i: i.df['colors'].apply(ColorSort.assign_f2_colors), "rows"),
+    "ColorSort.vectorized_colors": (lambda i: ColorSort.vectorized_colors(i.df['colors'], REFERENCE_COLORS_LOWER), "rows"),
+    "ColorSort.get_diff_df": (lambda i: ColorSort.get_diff_df(i.df, i.df[i.mask]), "rows"),
+    "ColorSort.diff_from_mask": (lambda i: ColorSort.diff_from_mask(i.df, i.mask), "rows"),
+    "ColorSort.group_by_f2_colors": (lambda i: ColorSort.group_by_f2_colors(i.df2, i.group_folder), "rows"),
+    "ColorSort.update_groups": (update_groups, "rows"),
+    "ColorSort.read_group_index": (lambda i: ColorSort.read_group_index(i.group_folder), "groups"),
+    "ColorSort.read_group_data": (lambda i: ColorSort.read_group_data(i.group_folder), "groups"),
+    "ColorSort.get_color_combos": (lambda i: ColorSort.get_color_combos(i.grouped_df, threshold=10), "groups"),
+    "ColorSort.merge_small_groups": (lambda i: ColorSort.merge_small_groups(i.group_folder, threshold=10), "groups"),
+    "ColorSort.plot_color_combos": (plot, "groups"),
+    "plotting.render_thresholds": (lambda i: render_thresholds(i.grouped_df, range(1, 201), str(i.workdir / "plots")), "groups"),
+    "ColorSort.write_group_dataset": (lambda i: ColorSort.write_group_dataset(i.df2, str(i.workdir / "dataset_bench.parquet")), "rows"),
+    "ColorSort.read_group_dataset": (lambda i: ColorSort.read_group_dataset(i.dataset, combos=list(i.grouped_df["color_combo"][:1])), "rows"),
+    "ColorSort.read_group_counts": (lambda i: ColorSort.read_group_counts(i.dataset), "groups"),
+    "SchoolStore.write_schools": (write_store, "rows"),
+    "colorsort.main": (run_main, "rows"),
+}
+
+
+def measure(function: Callable[[], object], repeat: int, memory: bool) -> tuple[float, float | None]:
+    """
+    Returns the best wall time of `repeat` runs and, if `memory`, the tracemalloc peak (MiB) of
+    one more, traced, run. Tracing is kept out of the timed runs because it slows them down.
+    """
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with quiet():
+            function()
+        best = min(best, time.perf_counter() - start)
+
+    if not memory:
+        return best, None
+    tracemalloc.start()
+    with quiet():
+        function()
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return best, peak
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str) -> dict[tuple[str, int], dict]:
+    """
+    Returns the latest recorded result of every `(case, rows)`.
+    """
+
+    latest = {}
+    if Path(path).exists():
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    latest[(record["case"], record["rows"])] = record
+    return latest
+
+
+def change(new: float | None, old: float | None) -> float | None:
+    # relative change in percent
+    if new is None or not old:
+        return None
+    return (new - old) / old * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000], help="school_data rows per run")
+    parser.add_argument("--tables", type=int, default=500, help="synthetic directory tables for the parser cases")
+    parser.add_argument("--cases", nargs="+", default=["*"], help="case names or glob patterns")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run that measures peak memory")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--no-record", action="store_true", help="do not append the results to the history file")
+    parser.add_argument("--fail-on-regression", type=float, metavar="PCT",
+                        help="exit with status 1 if a case got slower or bigger than its last result by more than PCT percent")
+    args = parser.parse_args()
+
+    log.remove()
+    selected = [name for name in CASES if any(fnmatch.fnmatch(name, pattern) for pattern in args.cases)]
+    previous = load_history(args.history)
+    commit = git_commit()
+    regressions = []
+
+    print(f"{'case':<30} {'rows':>11} {'time':>11} {'rows/s':>13} {'peak':>11} {'vs last':>17}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            inputs = Inputs(size, args.tables, Path(workdir))
+            for name in selected:
+                function, unit = CASES[name]
+                # * build the shared inputs outside the measurement
+                with quiet():
+                    if unit == "tables":
+                        inputs.tables
+                    else:
+                        inputs.df2, inputs.grouped_df
+
+                seconds, peak = measure(lambda: function(inputs), args.repeat, not args.no_memory)
+                count = {"tables": args.tables, "rows": size, "groups": len(inputs.grouped_df) if unit == "groups" else size}[unit]
+                record = {
+                    "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "commit": commit,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "case": name,
+                    "rows": size,
+                    "unit": unit,
+                    "count": count,
+                    "seconds": seconds,
+                    "rows_per_second": count / seconds if seconds else None,
+                    "peak_mib": peak,
+                }
+
+                last = previous.get((name, size))
+                slower = change(seconds, last and last["seconds"])
+                bigger = change(peak, last and last["peak_mib"])
+                versus = "" if slower is None else f"{slower:+6.1f}% t" + ("" if bigger is None else f" {bigger:+6.1f}% m")
+                peak_text = "" if peak is None else f"{peak:8.1f} MiB"
+                print(f"{name:<30} {size:>11,} {seconds:9.4f} s {record['rows_per_second']:13,.0f} {peak_text:>11} {versus:>17}")
+
+                if args.fail_on_regression is not None:
+                    if (slower or 0) > args.fail_on_regression or (bigger or 0) > args.fail_on_regression:
+                        regressions.append(f"{name} @ {size:,}")
+
+                if not args.no_record:
+                    Path(args.history).parent.mkdir(parents=True, exist_ok=True)
+                    with open(args.history, "a", encoding="utf-8") as file:
+                        file.write(json.dumps(record) + "\n")
+
+    if regressions:
+        print(f"Regressions over {args.fail_on_regression}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
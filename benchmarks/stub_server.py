@@ -0,0 +1,132 @@
+import hashlib
+import http.server
+import json
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+TABLE_TEMPLATE = """<table cellpadding="2" cellspacing="2" class="directory-table" width="100%"><tbody>
+<tr><td align="center" class="directory-bar" colspan="5"><strong>{name} (1-AAAA)</strong></td></tr>
+<tr><td colspan="2">{street}</td></tr>
+<tr><td colspan="2">{city}, GA {zip}</td></tr>
+<tr><td colspan="2">Colors: {colors}</td></tr>
+<tr><td colspan="2">Mascot: {mascot}</td></tr>
+</tbody></table>"""
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # the default backlog of 5 stalls concurrent clients on SYN retries
+
+
+class StubDirectoryServer:
+    """
+    A local stand-in for the school directory, for benchmarks and manual testing.
+    `GET /school-directory` serves the `#edit-dropdown` form, and `GET /school-directory?dropdown=<i>`
+    serves a directory table shaped like `data/table.html` for the i-th school, after `latency` seconds.
+    Responses carry an ETag and a matching `If-None-Match` is answered with 304.
+    Every `fail_every`-th table request answers 503 instead, to exercise retries.
+    """
+
+    def __init__(self, school_names: list[str], latency: float = 0.0, fail_every: int = 0, port: int = 0):
+        self.school_names = school_names
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+        self.revalidated = 0
+
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, body = server.respond(self.path)
+                payload = body.encode("utf-8")
+                etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    server.revalidated += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                if status == 200:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.httpd = _Server(("127.0.0.1", port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/school-directory"
+
+    def respond(self, path: str) -> tuple[int, str]:
+        query = parse_qs(urlsplit(path).query)
+        if "dropdown" not in query:
+            options = "".join(f'<option value="{i}">{name}</option>' for i, name in enumerate(self.school_names))
+            return 200, f'<form><select id="edit-dropdown"><option value="">- Select -</option>{options}</select></form>'
+
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and self.requests % self.fail_every == 0:
+            return 503, "Service Unavailable"
+
+        i = int(query["dropdown"][0])
+        table = TABLE_TEMPLATE.format(
+            name=self.school_names[i], street=f"{100 + i} Main Street", city="Macon",
+            zip=f"{31000 + i:05d}", colors="Red &amp; Black", mascot="Tigers",
+        )
+        return 200, f"<html><body>{table}</body></html>"
+
+    def __enter__(self) -> "StubDirectoryServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+STATIC_FORM_TEMPLATE = """<!DOCTYPE html>
+<html><body>
+<form><select id="edit-dropdown"><option value="">- Select -</option>{options}</select></form>
+<div id="directory"></div>
+<script>
+const tables = {tables};
+document.getElementById("edit-dropdown").addEventListener("change", (event) => {{
+  const html = tables[event.target.value] || "";
+  setTimeout(() => {{ document.getElementById("directory").innerHTML = html; }}, {delay_ms});
+}});
+</script>
+</body></html>"""
+
+
+def write_static_form(path: str, school_names: list[str], delay_ms: int = 0) -> str:
+    """
+    Writes a static HTML page that imitates the directory's `#edit-dropdown` form: choosing an
+    option renders that school's `.directory-table` after `delay_ms` milliseconds.
+    Returns the page as a `file://` URL for the Selenium engines.
+    """
+
+    options = "".join(f'<option value="{i}">{name}</option>' for i, name in enumerate(school_names))
+    tables = {
+        str(i): TABLE_TEMPLATE.format(
+            name=name, street=f"{100 + i} Main Street", city="Macon",
+            zip=f"{31000 + i:05d}", colors="Red &amp; Black", mascot="Tigers",
+        )
+        for i, name in enumerate(school_names)
+    }
+    page = STATIC_FORM_TEMPLATE.format(options=options, tables=json.dumps(tables), delay_ms=delay_ms)
+
+    target = Path(path).resolve()
+    target.write_text(page, encoding="utf-8")
+    return target.as_uri()
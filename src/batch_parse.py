@@ -0,0 +1,192 @@
+import csv
+import os
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .scraper import SchoolRecord, get_data_fast
+
+HTML_SUFFIXES = (".html", ".htm")
+BASE_FIELDS = ["school_name", "address", "mascot", "colors"]
+FULL_FIELDS = BASE_FIELDS + ["email", "website", "phone", "bd_phone", "fax", "personnel"]
+
+
+def _iter_html_files(folder: Path) -> Iterator[str]:
+    # one directory listing is held (and sorted, for a stable corpus order) at a time; the
+    # paths of the whole tree are yielded as they are found, never collected up front
+    stack = [folder]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_dir():
+                    stack.append(Path(entry.path))
+                elif entry.name.lower().endswith(HTML_SUFFIXES):
+                    yield entry.path
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def iter_work_units(source: str, chunksize: int = 64) -> Iterator[tuple]:
+    """
+    Splits a corpus of saved directory tables into work units of up to `chunksize` tables.
+    Folders (searched recursively) and zip archives yield `("file" | "zip", container, names)`
+    units that workers open themselves; tar archives (which cannot be read at random) are
+    streamed here and yield `("inline", source, [(name, html), ...])` units.
+    Args:
+        source (str): A folder, a `.zip` archive or a tar archive of `.html` files.
+        chunksize (int, optional): Tables per work unit. Defaults to 64.
+    Yields:
+        tuple: Work units for `parse_work_unit`.
+    Raises:
+        ValueError: If `source` is neither a folder nor a zip/tar archive.
+    """
+
+    path = Path(source)
+    if path.is_dir():
+        for chunk in _chunks(_iter_html_files(path), chunksize):
+            yield ("file", source, chunk)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = [name for name in archive.namelist() if name.lower().endswith(HTML_SUFFIXES)]
+        for chunk in _chunks(names, chunksize):
+            yield ("zip", source, chunk)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            members = (m for m in archive if m.isfile() and m.name.lower().endswith(HTML_SUFFIXES))
+            for chunk in _chunks(members, chunksize):
+                yield ("inline", source, [(m.name, archive.extractfile(m).read()) for m in chunk])
+    else:
+        raise ValueError(f"Not a folder or a zip/tar archive: {source}")
+
+
+def parse_work_unit(unit: tuple, full: bool = False) -> list[dict[str, str]]:
+    """
+    Parses one work unit with `get_data_fast`. Runs in the worker processes.
+    Args:
+        unit (tuple): A work unit from `iter_work_units`.
+        full (bool, optional): Whether to include the contact and personnel fields. Defaults to False.
+    Returns:
+        list[dict[str, str]]: One record per table, with a "source" key naming the file; tables
+            that cannot be read or parsed give a record with an "issue" key instead.
+    """
+
+    kind, container, items = unit
+    records = []
+
+    if kind == "zip":
+        with zipfile.ZipFile(container) as archive:
+            for name in items:
+                try:
+                    html = archive.read(name)
+                except Exception as e:
+                    # * a bad CRC, an encrypted or a truncated member (BadZipFile, RuntimeError, zlib.error, ...)
+                    records.append({'issue': f"Read failed: {e!r}", "source": name})
+                    continue
+                records.append(_to_record(name, html, full))
+    elif kind == "file":
+        for name in items:
+            source = os.path.relpath(name, container)
+            try:
+                with open(name, "rb") as file:
+                    html = file.read()
+            except OSError as e:
+                records.append({'issue': f"Read failed: {e!r}", "source": source})
+                continue
+            records.append(_to_record(source, html, full))
+    else:
+        records = [_to_record(name, html, full) for name, html in items]
+
+    return records
+
+
+def _to_record(name: str, html: bytes, full: bool) -> dict[str, str]:
+    # * one malformed table becomes an issue record instead of failing its whole work unit
+    try:
+        record = get_data_fast(html)
+        data = record.as_dict(full) if isinstance(record, SchoolRecord) else dict(record)
+    except Exception as e:
+        data = {'issue': f"Parse failed: {e!r}"}
+    data["source"] = name
+    return data
+
+
+def parse_batch(source: str, workers: int | None = None, chunksize: int = 64, full: bool = False) -> Iterator[dict[str, str]]:
+    """
+    Parses every saved directory table in a folder or archive across a process pool.
+    Work units are submitted lazily with at most two per worker in flight, and records are
+    yielded as each unit completes, in corpus order, so memory stays flat regardless of the
+    corpus size and no soup outlives its own table.
+    Args:
+        source (str): A folder, a `.zip` archive or a tar archive of `.html` files.
+        workers (int | None, optional): Number of worker processes. Defaults to the CPU count.
+        chunksize (int, optional): Tables per work unit. Defaults to 64.
+        full (bool, optional): Whether to include the contact and personnel fields. Defaults to False.
+    Yields:
+        dict[str, str]: One record per table, in the `get_data` shape plus a "source" key.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    units = iter_work_units(source, chunksize)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque(executor.submit(parse_work_unit, unit, full) for unit in islice(units, workers * 2))
+        while in_flight:
+            records = in_flight.popleft().result()
+            for unit in islice(units, 1):
+                in_flight.append(executor.submit(parse_work_unit, unit, full))
+            yield from records
+
+
+def write_records(records: Iterable[dict[str, str]], output_path: str, full: bool = False, batch_size: int = 10_000) -> int:
+    """
+    Streams records into a CSV file, or into a Parquet file (row group by row group) when
+    `output_path` ends with ".parquet". Only `batch_size` records are held at a time.
+    Args:
+        records (Iterable[dict[str, str]]): Records from `parse_batch`.
+        output_path (str): The output file.
+        full (bool, optional): Whether the records include the contact and personnel fields. Defaults to False.
+        batch_size (int, optional): Records per Parquet row group. Defaults to 10,000.
+    Returns:
+        int: Number of records written.
+    Raises:
+        ImportError: If a Parquet file is requested and pyarrow is not installed.
+    """
+
+    fieldnames = (FULL_FIELDS if full else BASE_FIELDS) + ["issue", "source"]
+    rows = 0
+
+    if output_path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(name, pa.string()) for name in fieldnames])
+        with pq.ParquetWriter(output_path, schema) as writer:
+            for batch in _chunks(records, batch_size):
+                columns = {name: [record.get(name) for record in batch] for name in fieldnames}
+                writer.write_table(pa.table(columns, schema=schema))
+                rows += len(batch)
+        return rows
+
+    with open(output_path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, restval="", lineterminator="\n")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            rows += 1
+
+    return rows
+
+
+if __name__ == "__main__":
+    import sys
+
+    source, output = sys.argv[1], sys.argv[2]
+    print(f"{write_records(parse_batch(source), output)} records written to {output}")
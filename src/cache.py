@@ -0,0 +1,194 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlencode
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached response body with the validators needed to revalidate it.
+    """
+
+    key: str
+    url: str
+    params: str
+    digest: str
+    body: str
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+    fresh: bool
+
+
+class ResponseCache:
+    """
+    A local HTTP response cache for the directory crawl.
+    Entries are keyed by URL + query parameters. Bodies are stored content-addressed under
+    `<root>/objects/<sha256[:2]>/<sha256>`, so identical responses are stored once, and a SQLite
+    index at `<root>/index.sqlite` keeps the validators (ETag / Last-Modified), the time the entry
+    was stored or last revalidated, and the last access time for LRU eviction.
+    An entry younger than `ttl` seconds is served without any request; an older one is
+    revalidated with a conditional request (see `conditional_headers` and `touch`).
+    When the bodies exceed `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, root: str = "data/cache", ttl: float = 7 * 24 * 3600, max_bytes: int = 512 * 1024 * 1024):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.root / "index.sqlite", check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                params TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)")
+
+    @staticmethod
+    def make_key(url: str, params: dict[str, str] | None = None) -> tuple[str, str]:
+        """
+        Builds the cache key for a request.
+        Returns:
+            tuple[str, str]: The key (sha256 of URL + sorted query string) and the query string.
+        """
+
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest(), query
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def get(self, url: str, params: dict[str, str] | None = None) -> CacheEntry | None:
+        """
+        Looks up a cached response and marks it as recently used.
+        Returns:
+            CacheEntry | None: The entry (with `fresh` set if it is younger than the TTL), or None
+                if nothing is cached or the body file has gone missing.
+        """
+
+        key, query = self.make_key(url, params)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT digest, etag, last_modified, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            digest, etag, last_modified, stored_at = row
+            try:
+                body = self.object_path(digest).read_text(encoding="utf-8")
+            except FileNotFoundError:
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self.db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+
+        fresh = time.time() - stored_at < self.ttl
+        return CacheEntry(key, url, query, digest, body, etag, last_modified, stored_at, fresh)
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry | None) -> dict[str, str]:
+        """
+        Returns the `If-None-Match` / `If-Modified-Since` headers to revalidate `entry`.
+        """
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def touch(self, entry: CacheEntry) -> None:
+        """
+        Records a successful revalidation (a 304 response), restarting the entry's TTL.
+        """
+
+        now = time.time()
+        with self.lock:
+            self.db.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, entry.key))
+
+    def put(self, url: str, params: dict[str, str] | None, body: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        """
+        Stores a response body and its validators, then evicts entries beyond `max_bytes`.
+        """
+
+        key, query = self.make_key(url, params)
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        now = time.time()
+
+        with self.lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+
+            old = self.db.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, query, digest, len(data), etag, last_modified, now, now),
+            )
+            if old and old[0] != digest:
+                self._release(old[0])
+            self._evict()
+
+    def _release(self, digest: str) -> None:
+        # delete a body file once no entry references it any more
+        if self.db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+            self.object_path(digest).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)").fetchone()[0]
+        while total > self.max_bytes:
+            row = self.db.execute("SELECT key, digest, size FROM entries ORDER BY accessed_at LIMIT 1").fetchone()
+            if row is None:
+                break
+            key, digest, size = row
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            if self.db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+                self.object_path(digest).unlink(missing_ok=True)
+                total -= size
+
+    def entries(self, url: str | None = None) -> Iterator[tuple[str, str, str]]:
+        """
+        Yields `(url, query string, body)` for every cached response (optionally only for `url`),
+        in the order they were first stored. Bodies are read one at a time.
+        """
+
+        with self.lock:
+            if url is None:
+                rows = self.db.execute("SELECT url, params, digest FROM entries ORDER BY rowid").fetchall()
+            else:
+                rows = self.db.execute("SELECT url, params, digest FROM entries WHERE url = ? ORDER BY rowid", (url,)).fetchall()
+
+        for entry_url, query, digest in rows:
+            try:
+                yield entry_url, query, self.object_path(digest).read_text(encoding="utf-8")
+            except FileNotFoundError:
+                continue
+
+    def close(self) -> None:
+        self.db.close()
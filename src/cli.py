@@ -0,0 +1,193 @@
+"""
+Command line entry point for every stage of the pipeline:
+
+    python -m src scrape --engine http --output data/school_data.csv
+    python -m src parse data/directory.pdf --output data/school_data_pdf.csv
+    python -m src sort --input data/school_data.csv --group-format sqlite
+    python -m src group data/grouped_data3 --threshold 10
+    python -m src plot data/grouped_data3 --thresholds 1 200 --output data/plots
+
+Only argparse is imported up front. Each subcommand imports the modules it needs when it runs,
+so `sort` never loads selenium or matplotlib (unless it is asked for a plot) and `--help` is
+instant.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# * Mirrors colorsort.GROUP_FOLDER_PATH; importing colorsort here would load pandas for `--help`
+GROUP_FOLDER_PATH = "data/grouped_data3"
+
+
+def given(args: argparse.Namespace, **names: str) -> dict:
+    """
+    Maps the options the user gave (not None) to keyword arguments, so that every other
+    argument keeps the default of the function it is passed to.
+    """
+
+    return {keyword: getattr(args, name) for keyword, name in names.items() if getattr(args, name) is not None}
+
+
+def read_group_counts(source: str):
+    """
+    Returns the group counts ("color_combo", "count") of a group folder, a Parquet group dataset
+    (".parquet") or a `SchoolStore` (".sqlite").
+    """
+
+    from .utils import ColorSort
+
+    if source.endswith(".sqlite"):
+        from .store import SchoolStore
+
+        with SchoolStore(source) as store:
+            return store.group_counts()
+    if source.endswith(".parquet"):
+        return ColorSort.read_group_counts(source)
+    return ColorSort.read_group_data(source)
+
+
+def scrape(args: argparse.Namespace) -> None:
+    from .web_automation import automation
+
+    options = given(args, workers="workers", metrics_path="metrics", store_path="store", output_path="output")
+    if args.journal is not None:
+        options["journal_path"] = args.journal or None
+    if args.cache_dir is not None:
+        options["cache_dir"] = args.cache_dir or None
+    df = automation(engine=args.engine, resume=not args.no_resume, **options)
+    print(f"{len(df)} schools scraped")
+
+
+def parse(args: argparse.Namespace) -> None:
+    from .sources import iter_records, write_school_data
+
+    count = write_school_data(iter_records(args.source, workers=args.workers), args.output)
+    print(f"{count} records written to {args.output}")
+
+
+def sort(args: argparse.Namespace) -> None:
+    from .colorsort import main
+
+    main(
+        normalize_aliases=args.normalize,
+        group_format=args.group_format,
+        incremental=args.incremental,
+        chunksize=args.chunksize,
+        metrics_path=args.metrics,
+        profile=args.profile,
+        plot_path=args.plot_path,
+        plot=args.plot_path is not None,
+        **given(
+            args,
+            school_data_path="input",
+            diff_path="diff",
+            group_folder_path="groups",
+            group_dataset_path="dataset",
+            store_path="store",
+            color_index_path="color_index",
+            manifest_path="manifest",
+        ),
+    )
+
+
+def group(args: argparse.Namespace) -> None:
+    from .utils import ColorSort
+
+    df_final, df_below = ColorSort.get_color_combos(read_group_counts(args.source), threshold=args.threshold)
+    print(df_final.to_string(index=False))
+    print(f"{len(df_below)} combos with fewer than {args.threshold} rows")
+
+    if args.merge and args.source.endswith(".sqlite"):
+        from .store import SchoolStore
+
+        with SchoolStore(args.source) as store:
+            merged = store.small_groups(args.threshold)
+        path = Path(args.source).parent / "merged_small_groups.csv"
+        merged.to_csv(path, index=False)
+        print(f"Merged DataFrame saved to {path}")
+    elif args.merge:
+        ColorSort.merge_small_groups(args.source, threshold=args.threshold)
+
+
+def plot(args: argparse.Namespace) -> None:
+    from .plotting import render_thresholds
+
+    low, high = args.thresholds if len(args.thresholds) == 2 else (args.thresholds[0], args.thresholds[0])
+    files = render_thresholds(
+        read_group_counts(args.source), range(low, high + 1), args.output, tuple(args.formats), args.workers
+    )
+    print(f"{len(files)} charts written to {args.output}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # * scrape
+    command = commands.add_parser("scrape", help="scrape the directory website (see web_automation.automation)")
+    command.add_argument("--engine", choices=["http", "async", "selenium", "pool"], default="http")
+    command.add_argument("--workers", type=int, help="concurrent requests, or browsers for the pool engine (16)")
+    command.add_argument("--output", help="school data CSV (data/school_data.csv)")
+    command.add_argument("--journal", help='progress journal (data/school_data.jsonl); "" disables it')
+    command.add_argument("--no-resume", action="store_true", help="clear the journal and start a fresh crawl")
+    command.add_argument("--cache-dir", help='HTTP response cache (data/cache); "" disables it')
+    command.add_argument("--metrics", help="export the scrape metrics to this .json / .prom file")
+    command.add_argument("--store", help="also write the records to this SQLite store")
+    command.set_defaults(run=scrape)
+
+    # * parse
+    command = commands.add_parser("parse", help="rebuild school data from offline sources (see sources.iter_records)")
+    command.add_argument("source", help="the PDF directory, a CSV file, or a folder / archive of saved tables")
+    command.add_argument("--output", default="data/school_data_offline.csv")
+    command.add_argument("--workers", type=int, help="worker processes (defaults to the CPU count)")
+    command.set_defaults(run=parse)
+
+    # * sort
+    command = commands.add_parser("sort", help="filter, diff and group the school data by color (see colorsort.main)")
+    command.add_argument("--input", help="school data CSV (data/school_data.csv)")
+    command.add_argument("--diff", help="CSV of the rows left out (data/school_data_diff.csv)")
+    command.add_argument("--groups", help="group folder of the csv format (data/grouped_data3)")
+    command.add_argument("--dataset", help="group dataset of the parquet format (data/grouped_data3.parquet)")
+    command.add_argument("--store", help="SQLite store of the sqlite format (data/schools.sqlite)")
+    command.add_argument("--color-index", help="color-alias index for --normalize (data/color_index.json)")
+    command.add_argument("--manifest", help="record manifest for --incremental (data/colorsort_manifest.json)")
+    command.add_argument("--group-format", choices=["csv", "parquet", "sqlite"], default="csv")
+    command.add_argument("--normalize", action="store_true", help="map color aliases to reference colors first")
+    command.add_argument("--incremental", action="store_true", help="recompute only new or changed records")
+    command.add_argument("--chunksize", type=int, help="stream the input in chunks of this many rows")
+    command.add_argument("--metrics", help="export the stage metrics to this .json / .prom file")
+    command.add_argument("--profile", choices=["cprofile", "pyinstrument"])
+    command.add_argument("--plot-path", help="also render the combo chart to this .png / .svg file")
+    command.set_defaults(run=sort)
+
+    # * group
+    command = commands.add_parser("group", help="summarize (and merge) the color groups")
+    command.add_argument("source", nargs="?", default=GROUP_FOLDER_PATH, help="group folder, .parquet dataset or .sqlite store")
+    command.add_argument("--threshold", type=int, default=10)
+    command.add_argument("--merge", action="store_true", help="merge the groups under the threshold into merged_small_groups.csv")
+    command.set_defaults(run=group)
+
+    # * plot
+    command = commands.add_parser("plot", help="render combo charts for one or a range of thresholds (see plotting)")
+    command.add_argument("source", nargs="?", default=GROUP_FOLDER_PATH, help="group folder, .parquet dataset or .sqlite store")
+    command.add_argument("--thresholds", type=int, nargs="+", default=[10], metavar="N", help="a threshold, or LOW HIGH")
+    command.add_argument("--output", default="data/plots")
+    command.add_argument("--formats", nargs="+", default=["png"])
+    command.add_argument("--workers", type=int, help="render processes (defaults to the CPU count)")
+    command.set_defaults(run=plot)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "plot" and len(args.thresholds) > 2:
+        parser.error("--thresholds takes a threshold or LOW HIGH")
+    if args.command == "group" and args.merge and args.source.endswith(".parquet"):
+        parser.error("--merge needs a group folder or a .sqlite store")
+    args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+# * Spellings seen in the directory that the suffix / fuzzy rules cannot resolve on their own
+DEFAULT_ALIASES = {
+    "grey": "Gray",
+    "navy blue": "Navy",
+    "royal": "Royal Blue",
+    "kelley green": "Kelly Green",
+    "lime green": "Lime",
+    "cardinal red": "Cardinal",
+    "garnet": "Maroon",
+    "garnett": "Maroon",
+    "wine": "Burgundy",
+    "carmine": "Crimson",
+    "turquoise": "Teal",
+    "cyan": "Teal",
+    "columbia": "Columbia Blue",
+    "carolina": "Carolina Blue",
+}
+
+# * Bump when the resolution rules change, so indexes saved by an older version are rebuilt
+INDEX_VERSION = 1
+
+SEPARATORS = re.compile(r"\s*(?:[,&/]|\band\b)\s*")
+PARENTHESES = re.compile(r"\([^()]*\)")
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercases a color name and collapses whitespace and stray punctuation.
+    """
+
+    return " ".join(re.sub(r"[^a-z ]", " ", text.lower()).split())
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between `a` and `b`, giving up (returning `limit + 1`) as soon as it
+    must exceed `limit`.
+    """
+
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def index_fingerprint(reference_colors: Iterable[str], aliases: dict[str, str], max_distance: int) -> str:
+    """
+    Fingerprints everything a saved index was built from. An index with a different fingerprint
+    is stale and must be rebuilt.
+    """
+
+    payload = json.dumps([INDEX_VERSION, sorted(reference_colors), sorted(aliases.items()), max_distance])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ColorAliasIndex:
+    """
+    A precomputed index that maps raw color names to canonical reference colors.
+    A normalized name is resolved by, in order:
+        1. an exact-match hash of the reference colors and aliases ("grey" -> "Gray"),
+        2. the longest trailing run of words that matches exactly ("Safety Gold" -> "Gold",
+           "Metallic Vegas Gold" -> "Vegas Gold"),
+        3. a prefix trie, when the name completes to a single color ("purp" -> "Purple"),
+        4. a bounded edit-distance search among the keys sharing a character trigram with the
+           name ("maroom" -> "Maroon").
+    Lookups are memoized with an LRU cache, so repeated strings cost one dictionary hit. The
+    index is serializable (`save` / `load`) so it can be loaded at startup without rebuilding.
+    """
+
+    def __init__(self, reference_colors: Iterable[str], aliases: dict[str, str] | None = None, max_distance: int = 2, cache_size: int = 65536):
+        reference_colors = list(reference_colors)
+        aliases = DEFAULT_ALIASES if aliases is None else aliases
+        self.max_distance = max_distance
+        self.fingerprint = index_fingerprint(reference_colors, aliases, max_distance)
+        self.exact: dict[str, str] = {normalize(color): color for color in reference_colors}
+        for alias, color in aliases.items():
+            self.exact.setdefault(normalize(alias), color)
+
+        self.trie: dict = {}
+        self.grams: dict[str, list[str]] = {}
+        for key in self.exact:
+            self._add_to_trie(key)
+            for gram in self._trigrams(key):
+                self.grams.setdefault(gram, []).append(key)
+
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    @staticmethod
+    def _trigrams(text: str) -> set[str]:
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _add_to_trie(self, key: str) -> None:
+        node = self.trie
+        for char in key:
+            node = node.setdefault(char, {})
+            # * every node remembers the colors below it, so a prefix resolves in O(len(prefix))
+            colors = node.setdefault("*", [])
+            if self.exact[key] not in colors:
+                colors.append(self.exact[key])
+
+    def _complete(self, prefix: str) -> str | None:
+        node = self.trie
+        for char in prefix:
+            if char not in node:
+                return None
+            node = node[char]
+        colors = node.get("*", [])
+        return colors[0] if len(colors) == 1 else None
+
+    def _fuzzy(self, name: str) -> str | None:
+        limit = 1 if len(name) <= 5 else self.max_distance
+        candidates = {key for gram in self._trigrams(name) for key in self.grams.get(gram, ())}
+        best, best_distance = None, limit + 1
+        for key in sorted(candidates):
+            distance = edit_distance(name, key, limit)
+            if distance < best_distance:
+                best, best_distance = self.exact[key], distance
+        return best
+
+    def _lookup(self, raw: str) -> str | None:
+        name = normalize(raw)
+        if not name:
+            return None
+        if name in self.exact:
+            return self.exact[name]
+
+        words = name.split()
+        for start in range(1, len(words)):
+            suffix = " ".join(words[start:])
+            if suffix in self.exact:
+                return self.exact[suffix]
+
+        if len(name) >= 3:
+            completed = self._complete(name)
+            if completed:
+                return completed
+
+        return self._fuzzy(name)
+
+    def normalize_color_string(self, color_string: str) -> str:
+        """
+        Rewrites a raw colors value with canonical reference colors, in the "A, B & C" format of
+        the directory. Parenthesized notes are dropped and "/", "and" are treated as separators.
+        Colors that cannot be resolved are kept as written, so the row still shows up in the diff.
+        Args:
+            color_string (str): A raw colors value, e.g. "Black & Safety Gold".
+        Returns:
+            str: The normalized value, e.g. "Black & Gold". Non-strings are returned unchanged.
+        """
+
+        if not isinstance(color_string, str):
+            return color_string
+
+        text, previous = color_string, None
+        while text != previous:  # * innermost parentheses first, so nested notes go too
+            text, previous = PARENTHESES.sub(" ", text), text
+
+        parts = [part for part in SEPARATORS.split(text) if part.strip()]
+        colors = [self.lookup(part) or part.strip() for part in parts]
+        if len(colors) < 2:
+            return "".join(colors)
+        return ", ".join(colors[:-1]) + " & " + colors[-1]
+
+    def normalize_column(self, colors: pd.Series) -> pd.Series:
+        """
+        Applies `normalize_color_string` to a colors column, once per distinct value.
+        Args:
+            colors (pd.Series): The raw colors column.
+        Returns:
+            pd.Series: The normalized column, with the index of `colors`.
+        """
+
+        codes, uniques = pd.factorize(colors, use_na_sentinel=False)
+        normalized = np.array([self.normalize_color_string(value) for value in uniques], dtype=object)
+        return pd.Series(normalized[codes], index=colors.index, dtype=object)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index (fingerprint, exact map, trie and trigram index) to a JSON file.
+        """
+
+        data = {"fingerprint": self.fingerprint, "max_distance": self.max_distance, "exact": self.exact, "trie": self.trie, "grams": self.grams}
+        Path(path).write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str, cache_size: int = 65536) -> "ColorAliasIndex":
+        """
+        Loads an index written by `save` without rebuilding it.
+        """
+
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        index = cls.__new__(cls)
+        index.fingerprint = data.get("fingerprint")
+        index.max_distance = data["max_distance"]
+        index.exact = data["exact"]
+        index.trie = data["trie"]
+        index.grams = data["grams"]
+        index.lookup = lru_cache(maxsize=cache_size)(index._lookup)
+        return index
+
+    @classmethod
+    def load_or_build(
+        cls, path: str, reference_colors: Iterable[str], aliases: dict[str, str] | None = None, max_distance: int = 2
+    ) -> "ColorAliasIndex":
+        """
+        Loads the index at `path` if it was built from the same reference colors, aliases and
+        `max_distance` (see `index_fingerprint`); otherwise builds it and saves it there.
+        """
+
+        reference_colors = list(reference_colors)
+        fingerprint = index_fingerprint(reference_colors, DEFAULT_ALIASES if aliases is None else aliases, max_distance)
+        if Path(path).exists():
+            index = cls.load(path)
+            if index.fingerprint == fingerprint:
+                return index
+
+        index = cls(reference_colors, aliases, max_distance)
+        index.save(path)
+        return index
@@ -1,8 +1,45 @@
 import pandas as pd
 
+from .color_index import ColorAliasIndex
+from .incremental import run_incremental
+from .metrics import metrics
+from .streaming import stream_colorsort
 from .utils import ColorSort
 
-def main():
+REFERENCE_COLORS = {
+    "Black", "Blue", "Brown", "Burgundy", "Cardinal", "Carolina Blue", "Columbia Blue",
+    "Crimson", "Dark Gray", "Dark Green", "Forest Green", "Gold", "Gray", "Green",
+    "Hunter Green", "Kelly Green", "Lime", "Light Blue", "Light Pink", "Magenta",
+    "Maroon", "Navy", "Neon Green", "Neon Yellow", "Old Gold", "Orange", "Pink",
+    "Purple", "Red", "Royal Blue", "Scarlet", "Silver", "Sports Yellow", "Teal",
+    "Vegas Gold", "White", "Yellow"
+}
+
+SCHOOL_DATA_PATH = "data/school_data.csv"
+DF_DIFF_PATH = "data/school_data_diff.csv"
+GROUP_FOLDER_PATH = "data/grouped_data3"
+GROUP_DATASET_PATH = "data/grouped_data3.parquet"
+COLOR_INDEX_PATH = "data/color_index.json"
+MANIFEST_PATH = "data/colorsort_manifest.json"
+STORE_PATH = "data/schools.sqlite"
+
+def main(
+    normalize_aliases: bool = False,
+    group_format: str = "csv",
+    incremental: bool = False,
+    chunksize: int | None = None,
+    metrics_path: str | None = None,
+    profile: str | None = None,
+    plot_path: str | None = None,
+    plot: bool = True,
+    school_data_path: str = SCHOOL_DATA_PATH,
+    diff_path: str = DF_DIFF_PATH,
+    group_folder_path: str = GROUP_FOLDER_PATH,
+    group_dataset_path: str = GROUP_DATASET_PATH,
+    store_path: str = STORE_PATH,
+    color_index_path: str = COLOR_INDEX_PATH,
+    manifest_path: str = MANIFEST_PATH,
+):
     """
     Main function to process and analyze school color data.
     This function performs the following steps:
@@ -13,57 +50,148 @@ def main():
     5. Groups the data by these secondary color categories and saves the grouped data to separate CSV files.
     6. Reads the grouped data and identifies color combinations based on a specified threshold.
     7. Visualizes the identified color combinations.
-    Constants:
-        SCHOOL_DATA_PATH (str): Path to the input CSV file containing school data.
-        DF_DIFF_PATH (str): Path to save the CSV file containing rows that were filtered out.
-        GROUP_FOLDER_PATH (str): Path to save grouped data files.
+    Args:
+        normalize_aliases (bool, optional): Whether to rewrite the colors column with the canonical
+            reference colors first (see `ColorAliasIndex`), so spellings like "Safety Gold" or
+            "Emerald Green" are kept instead of dropping into the diff. Defaults to False.
+        group_format (str, optional): "csv" for one CSV file per group in `group_folder_path`, or
+            "parquet" for a dataset partitioned on 'f2_colors' in `group_dataset_path`, with the
+            group counts in a sidecar file, or "sqlite" for the indexed `SchoolStore` in `store_path`,
+            whose group counts are maintained on write. Defaults to "csv".
+        incremental (bool, optional): Whether to update the diff file and the grouped CSV files
+            from the last run's manifest, recomputing only new or changed records (see
+            `run_incremental`). Defaults to False.
+        chunksize (int | None, optional): If given, the input is streamed in chunks of this many
+            rows and the groups are appended to as they come (see `stream_colorsort`), so memory
+            does not grow with the input. Defaults to None (the whole file at once).
+        metrics_path (str | None, optional): If given, the wall time, CPU time, peak RSS and rows
+            per second of every stage (read, filter, diff, group, write, plot) are exported there,
+            as JSON or, for ".prom" files, Prometheus text (see `metrics.Metrics`). Defaults to None.
+        profile (str | None, optional): "cprofile" or "pyinstrument" to profile every stage into
+            "data/profiles". Defaults to None.
+        plot_path (str | None, optional): If given, the chart is rendered headless and saved to this
+            PNG/SVG file instead of being drawn with pyplot. Defaults to None.
+        plot (bool, optional): Whether to visualize the color combinations at all; without it
+            matplotlib is never imported. Defaults to True.
+        school_data_path (str, optional): Path to the input CSV file containing school data.
+        diff_path (str, optional): Path to save the CSV file containing rows that were filtered out.
+        group_folder_path (str, optional): Path to save grouped data files.
+        group_dataset_path (str, optional): Path to save the partitioned grouped dataset.
+        store_path (str, optional): Path of the SQLite store written by the "sqlite" group format.
+        color_index_path (str, optional): Path of the serialized color-alias index.
+        manifest_path (str, optional): Path of the record-hash manifest used by incremental runs.
+        Each path defaults to the matching module constant (e.g. SCHOOL_DATA_PATH), under "data/".
     Dependencies:
         - Requires the `ColorSort` class with the following methods:
-            - `isin_refcolors`: Checks if a color is in the reference color set.
-            - `get_diff_df`: Computes the difference between two DataFrames.
-            - `assign_f2_colors`: Assigns secondary color categories.
+            - `vectorized_colors`: Computes the reference mask and secondary color categories for the whole column.
+            - `diff_from_mask`: Returns the rows the reference-color filter left out.
             - `group_by_f2_colors`: Groups data by secondary color categories and saves to files.
             - `read_group_data`: Reads grouped data from files.
+            - `write_group_dataset` / `read_group_counts`: The same for the partitioned dataset.
             - `get_color_combos`: Identifies color combinations based on a threshold.
             - `plot_color_combos`: Visualizes color combinations.
     Returns:
         None
     """
-    SCHOOL_DATA_PATH = "data/school_data.csv"
-    DF_DIFF_PATH = "data/school_data_diff.csv"
-    GROUP_FOLDER_PATH = "data/grouped_data3"
-
-    df = pd.read_csv(SCHOOL_DATA_PATH)
-    df = df.dropna(subset=['colors']).reset_index(drop=True)
-
-    reference_colors = {
-        "Black", "Blue", "Brown", "Burgundy", "Cardinal", "Carolina Blue", "Columbia Blue",
-        "Crimson", "Dark Gray", "Dark Green", "Forest Green", "Gold", "Gray", "Green",
-        "Hunter Green", "Kelly Green", "Lime", "Light Blue", "Light Pink", "Magenta",
-        "Maroon", "Navy", "Neon Green", "Neon Yellow", "Old Gold", "Orange", "Pink",
-        "Purple", "Red", "Royal Blue", "Scarlet", "Silver", "Sports Yellow", "Teal",
-        "Vegas Gold", "White", "Yellow"
-    }
-
+    reference_colors = REFERENCE_COLORS
     reference_colors_lower = {color.lower() for color in reference_colors}
 
-    df2 = df[df['colors'].apply(lambda x: ColorSort.isin_refcolors(x, reference_colors_lower))] # * Filter rows where isin_refcolors returns True
-    df2 = df2.reset_index(drop=True)
+    alias_index = None
+    if normalize_aliases:
+        alias_index = ColorAliasIndex.load_or_build(color_index_path, reference_colors)
+
+    if chunksize and (group_format != "csv" or incremental):
+        raise ValueError("Streaming runs only support full runs in the csv group format")
+    if incremental and group_format != "csv":
+        raise ValueError("Incremental runs only support the csv group format")
+
+    # * the registry is process-wide: start from empty, so the export holds this run only
+    metrics.reset()
+    metrics.configure(profile)
+    try:
+        if chunksize:
+            # * Chunk by chunk: memory is bounded by chunksize, group counts are kept on the side
+            with metrics.stage("stream") as timing:
+                counts = stream_colorsort(school_data_path, reference_colors_lower, group_folder_path, diff_path, chunksize, alias_index)
+                timing.rows = sum(counts.values())
+            grouped_df = ColorSort.read_group_data(group_folder_path)
+        else:
+            grouped_df = _sort_in_memory(
+                school_data_path, diff_path, group_folder_path, group_dataset_path, manifest_path, store_path,
+                reference_colors_lower, alias_index, group_format, incremental,
+            )
+
+        df_final, df_below = ColorSort.get_color_combos(grouped_df, threshold=10)
+
+        # * visualize
+        if plot:
+            with metrics.stage("plot", rows=len(df_final)):
+                ColorSort.plot_color_combos(df_final, df_below, plot_path)
+    finally:
+        if metrics_path:
+            metrics.export(metrics_path)
+
+
+def _sort_in_memory(
+    SCHOOL_DATA_PATH: str,
+    DF_DIFF_PATH: str,
+    GROUP_FOLDER_PATH: str,
+    GROUP_DATASET_PATH: str,
+    MANIFEST_PATH: str,
+    STORE_PATH: str,
+    reference_colors_lower: set[str],
+    alias_index: ColorAliasIndex | None,
+    group_format: str,
+    incremental: bool,
+) -> pd.DataFrame:
+    # the read -> filter -> diff -> group stages of `main` on the whole file; returns the group counts
+    with metrics.stage("read") as timing:
+        df = pd.read_csv(SCHOOL_DATA_PATH)
+        df = df.dropna(subset=['colors']).reset_index(drop=True)
+
+        if alias_index is not None:
+            # * Normalize each distinct colors value once and broadcast back by its factorized code
+            df['colors'] = alias_index.normalize_column(df['colors'])
+        timing.rows = len(df)
+
+    if incremental:
+        # * Only new or changed records are recomputed; only the groups they touch are rewritten
+        with metrics.stage("incremental", rows=len(df)):
+            run_incremental(df, reference_colors_lower, GROUP_FOLDER_PATH, DF_DIFF_PATH, MANIFEST_PATH)
+        return ColorSort.read_group_data(GROUP_FOLDER_PATH)
+
+    with metrics.stage("filter", rows=len(df)):
+        # * Tokenize the colors column once: reference mask and f2_colors key in one columnar pass
+        color_columns = ColorSort.vectorized_colors(df['colors'], reference_colors_lower)
+        isin_ref = color_columns['isin_ref'].to_numpy()
+
+        df2 = df[isin_ref] # * Filter rows where isin_refcolors returns True
+        df2 = df2.reset_index(drop=True)
+
+    with metrics.stage("diff", rows=len(df)):
+        # * Save the filtered DataFrame to a CSV file
+        df_diff = ColorSort.diff_from_mask(df, isin_ref)
+        df_diff.to_csv(DF_DIFF_PATH, index=False)
 
-    # * Save the filtered DataFrame to a CSV file
-    df_diff = ColorSort.get_diff_df(df, df2)
-    df_diff.to_csv(DF_DIFF_PATH, index=False)
+    df2["f2_colors"] = color_columns['f2_colors'].to_numpy()[isin_ref]
 
-    df2["f2_colors"] = df2["colors"].apply(lambda x: ColorSort.assign_f2_colors(x))
+    with metrics.stage("group", rows=len(df2)):
+        if group_format == "parquet":
+            # * one partitioned dataset; the counts come from its sidecar, not from the data files
+            ColorSort.write_group_dataset(df2, GROUP_DATASET_PATH)
+            return ColorSort.read_group_counts(GROUP_DATASET_PATH)
 
-    # * saving "group by" csv files
-    ColorSort.group_by_f2_colors(df2, GROUP_FOLDER_PATH)
+        if group_format == "sqlite":
+            from .store import SchoolStore  # store pulls in the table parser (bs4, lxml) for its fields
 
-    grouped_df = ColorSort.read_group_data(GROUP_FOLDER_PATH)
-    df_final, df_below = ColorSort.get_color_combos(grouped_df, threshold=10)
+            # * the schools and their groups go to the indexed store; the counts are maintained there
+            with SchoolStore(STORE_PATH) as store:
+                store.write_schools(df, reference_colors_lower, color_columns=color_columns)
+                return store.group_counts()
 
-    # * visualize
-    ColorSort.plot_color_combos(df_final, df_below)
+        # * saving "group by" csv files
+        ColorSort.group_by_f2_colors(df2, GROUP_FOLDER_PATH)
+        return ColorSort.read_group_data(GROUP_FOLDER_PATH)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,331 @@
+import asyncio
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+
+import aiohttp
+import pandas as pd
+from loguru import logger as log
+
+from .cache import ResponseCache
+from .fetcher import DIRECTORY_URL, DROPDOWN_PARAM, match_school_options, parse_school_options, parse_school_table
+from .journal import CrawlJournal
+from .metrics import metrics
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    An asyncio token bucket that allows `rate` acquisitions per second with bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Waits until a token is available and takes it.
+        """
+
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class CrawlStats:
+    """
+    Throughput and latency figures collected by a `CrawlScheduler` run.
+    """
+
+    pages: int = 0
+    failures: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns the `q`-th percentile (0-100) of the request latencies in seconds, using the
+        nearest-rank method. Returns 0.0 if no requests were made.
+        """
+
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "pages": self.pages,
+            "failures": self.failures,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "elapsed_s": round(self.elapsed, 3),
+            "pages_per_sec": round(self.pages_per_sec, 2),
+            "p50_ms": round(self.percentile(50) * 1000, 1),
+            "p90_ms": round(self.percentile(90) * 1000, 1),
+            "p99_ms": round(self.percentile(99) * 1000, 1),
+        }
+
+
+class CrawlScheduler:
+    """
+    Concurrent asyncio crawler for the school directory.
+    Schools are taken from a priority queue (lower priority values first, then insertion order)
+    by `concurrency` workers. Every request waits on a per-host token bucket, and transient
+    failures (connection errors, timeouts, 429/5xx) are retried with exponential backoff and
+    full jitter. Records are yielded as soon as they are parsed, in the `get_data` shape.
+    An optional `ResponseCache` serves fresh responses without touching the network.
+    """
+
+    def __init__(
+        self,
+        url: str = DIRECTORY_URL,
+        concurrency: int = 16,
+        rate: float = 20.0,
+        burst: int | None = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        timeout: float = 10.0,
+        cache: ResponseCache | None = None,
+    ):
+        self.url = url
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.cache = cache
+
+        self.queue: asyncio.PriorityQueue | None = None
+        self.pending: list[tuple[int, int, int, str, str]] = []
+        self.counter = itertools.count()
+        self.buckets: dict[str, TokenBucket] = {}
+        self.stats = CrawlStats()
+
+    def add(self, value: str, name: str, index: int | None = None, priority: int = 0) -> None:
+        """
+        Queues a school for crawling.
+        Args:
+            value (str): The `#edit-dropdown` option value of the school.
+            name (str): The school name (used for logging).
+            index (int | None, optional): Position of the school in the output. Defaults to insertion order.
+            priority (int, optional): Lower values are crawled first. Defaults to 0.
+        """
+
+        seq = next(self.counter)
+        self.pending.append((priority, seq, seq if index is None else index, value, name))
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def request(self, session: aiohttp.ClientSession, params: dict[str, str] | None = None) -> str:
+        """
+        Performs one rate-limited GET with retries and returns the response body.
+        With a cache, a fresh cached body is returned without a request and a stale one is
+        revalidated with a conditional request.
+        Raises:
+            aiohttp.ClientError | asyncio.TimeoutError: If the request still fails after `max_retries` retries.
+        """
+
+        entry = self.cache.get(self.url, params) if self.cache is not None else None
+        if entry is not None and entry.fresh:
+            self.stats.cache_hits += 1
+            return entry.body
+        headers = ResponseCache.conditional_headers(entry)
+
+        bucket = self.bucket_for(self.url)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            start = time.monotonic()
+            try:
+                async with session.get(self.url, params=params, headers=headers) as response:
+                    body = await response.text()
+                    self.stats.latencies.append(time.monotonic() - start)
+                    metrics.observe("fetch", self.stats.latencies[-1])
+                    if response.status == 304 and entry is not None:
+                        self.cache.touch(entry)
+                        return entry.body
+                    response.raise_for_status()
+                    if self.cache is not None:
+                        self.cache.put(self.url, params, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                    return body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                permanent = isinstance(e, aiohttp.ClientResponseError) and e.status not in RETRY_STATUSES
+                if permanent or attempt == self.max_retries:
+                    raise
+                self.stats.retries += 1
+                delay = self.backoff(attempt)
+                log.debug(f"Retrying {params} in {delay:.2f}s after: {e!r}")
+                await asyncio.sleep(delay)
+
+        raise RuntimeError("unreachable")
+
+    async def worker(self, session: aiohttp.ClientSession, results: asyncio.Queue) -> None:
+        while True:
+            _, _, index, value, name = await self.queue.get()
+            try:
+                html = await self.request(session, {DROPDOWN_PARAM: value})
+                record = parse_school_table(html)
+                self.stats.pages += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                log.error(f"Request for {name} failed: {e!r}")
+                record = {'issue': f"Request failed: {e!r}"}
+                self.stats.failures += 1
+            except Exception as e:
+                # * any other error (a decode or parse failure) must still produce a result,
+                # * or `crawl` would wait for it forever
+                log.error(f"Processing {name} failed: {e!r}")
+                record = {'issue': f"Processing failed: {e!r}"}
+                self.stats.failures += 1
+            try:
+                await results.put((index, record))
+            finally:
+                self.queue.task_done()
+
+    async def crawl(self) -> AsyncIterator[tuple[int, dict[str, str]]]:
+        """
+        Crawls every queued school and yields `(index, record)` pairs as they complete.
+        """
+
+        self.queue = asyncio.PriorityQueue()
+        for item in self.pending:
+            self.queue.put_nowait(item)
+        total = len(self.pending)
+        self.pending = []
+        self.stats = CrawlStats()
+
+        results: asyncio.Queue = asyncio.Queue()
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            workers = [asyncio.create_task(self.worker(session, results)) for _ in range(self.concurrency)]
+            try:
+                for _ in range(total):
+                    yield await results.get()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                self.stats.finished = time.monotonic()
+
+    async def get_options(self) -> list[tuple[str, str]]:
+        """
+        Requests the directory page and returns its `#edit-dropdown` options.
+        """
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            return parse_school_options(await self.request(session))
+
+
+async def crawl_async(school_names: list[str], scheduler: CrawlScheduler, journal: CrawlJournal | None = None) -> list[dict[str, str]]:
+    """
+    Resolves `school_names` against the directory dropdown and crawls them with `scheduler`.
+    Args:
+        school_names (list[str]): School names to crawl.
+        scheduler (CrawlScheduler): A configured scheduler.
+        journal (CrawlJournal | None, optional): If given, schools already finished in the journal
+            are skipped and every new record is appended to it as soon as it arrives. Defaults to None.
+    Returns:
+        list[dict[str, str]]: One `get_data` record per crawled school, in `school_names` order.
+    Raises:
+        ValueError: If the directory page has no `#edit-dropdown` options.
+    """
+
+    options = await scheduler.get_options()
+    if not options:
+        raise ValueError(f"No #edit-dropdown options found at {scheduler.url}")
+
+    targets = match_school_options(options, school_names)
+    if journal is not None:
+        pending = set(journal.pending([(index, name) for index, _, name in targets]))
+        targets = [target for target in targets if (target[0], target[2]) in pending]
+
+    names = {}
+    for index, value, name in targets:
+        scheduler.add(value, name, index=index)
+        names[index] = name
+
+    data = {}
+    async for index, record in scheduler.crawl():
+        data[index] = record
+        if journal is not None:
+            journal.append(index, names[index], record)
+
+    return [data[index] for index in sorted(data)]
+
+
+def crawl(
+    school_names: list[str] | None = None,
+    url: str = DIRECTORY_URL,
+    concurrency: int = 16,
+    rate: float = 20.0,
+    journal: CrawlJournal | None = None,
+    cache: ResponseCache | None = None,
+) -> pd.DataFrame:
+    """
+    Crawls the school directory with a `CrawlScheduler` and returns the records as a DataFrame.
+    Args:
+        school_names (list[str] | None, optional): School names to crawl. If None, the names are
+            read from "data/school_names.txt".
+        url (str, optional): URL of the school directory page. Defaults to `DIRECTORY_URL`.
+        concurrency (int, optional): Maximum number of requests in flight. Defaults to 16.
+        rate (float, optional): Maximum requests per second per host. Defaults to 20.
+        journal (CrawlJournal | None, optional): If given, the crawl resumes from the journal and
+            the result is rebuilt from it (see `crawl_async`). Defaults to None.
+        cache (ResponseCache | None, optional): Response cache to read from and fill. Defaults to None.
+    Returns:
+        pd.DataFrame: A DataFrame with one `get_data` record per school.
+    """
+
+    if school_names is None:
+        with open("data/school_names.txt", "r", encoding="utf-8") as file:
+            school_names = [line.strip() for line in file.readlines()]
+
+    scheduler = CrawlScheduler(url=url, concurrency=concurrency, rate=rate, cache=cache)
+    data = asyncio.run(crawl_async(school_names, scheduler, journal))
+    log.info(f"Crawl stats: {scheduler.stats.summary()}")
+
+    if journal is not None:
+        return pd.DataFrame(journal.records())
+    return pd.DataFrame(data)
+
+
+if __name__ == "__main__":
+    print(crawl())
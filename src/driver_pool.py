@@ -0,0 +1,221 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import Select, WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from bs4 import BeautifulSoup
+import pandas as pd
+from loguru import logger as log
+
+from .fetcher import DIRECTORY_URL
+from .journal import CrawlJournal
+from .metrics import metrics
+from .scraper import get_data
+from .web_automation import chromedriver_path, create_driver
+
+
+def make_shards(targets: list[tuple[int, str]], workers: int) -> list[list[tuple[int, str]]]:
+    """
+    Splits the `(index, school_name)` targets into `workers` contiguous shards.
+    Args:
+        targets (list[tuple[int, str]]): `(index, school_name)` pairs, where index is the school's
+            position in the dropdown.
+        workers (int): Number of shards to create.
+    Returns:
+        list[list[tuple[int, str]]]: The non-empty shards.
+    """
+
+    size = -(-len(targets) // max(1, workers))  # ceiling division
+    return [targets[i:i + size] for i in range(0, len(targets), size)] if size else []
+
+
+def table_for(name: str):
+    """
+    Returns a `WebDriverWait` condition that is met once the directory table shows `name`.
+    Waiting for the school name (instead of just the table) keeps the previous school's table
+    from being read again while the next one loads.
+    """
+
+    def condition(driver):
+        try:
+            table = driver.find_element(By.CLASS_NAME, "directory-table")
+            heading = table.find_element(By.TAG_NAME, "td").text.strip()
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+        return table if heading.split('(')[0].strip() == name else False
+
+    return condition
+
+
+def scrape_school(driver, wait: WebDriverWait, index: int, name: str) -> dict[str, str]:
+    """
+    Selects one school in the `#edit-dropdown` form and extracts its directory table with `get_data`.
+    The option is picked by position (`index` + 1, after the placeholder) so duplicate school
+    names stay apart; if that option does not carry `name`, it is picked by its text instead.
+    Args:
+        driver: A WebDriver with the directory page open.
+        wait (WebDriverWait): A wait bound to `driver`.
+        index (int): Position of the school in `data/school_names.txt`.
+        name (str): The school name.
+    Returns:
+        dict[str, str]: The record returned by `get_data`.
+    Raises:
+        TimeoutException: If the dropdown or the school's table does not load in time.
+        WebDriverException: If the browser crashed or lost the page.
+    """
+
+    select = Select(wait.until(EC.presence_of_element_located((By.ID, "edit-dropdown"))))
+    select.select_by_index(index + 1)
+    if select.first_selected_option.text.strip() != name:
+        select.select_by_visible_text(name)
+
+    with metrics.timer("wait_for_table"):
+        table_element = wait.until(table_for(name))
+
+    with metrics.timer("parse"):
+        soup = BeautifulSoup(table_element.get_attribute("outerHTML"), "html.parser")
+        return get_data(soup)
+
+
+def quit_driver(driver) -> None:
+    """
+    Quits `driver`, ignoring errors from a browser that has already crashed. Does nothing for None.
+    """
+
+    if driver is None:
+        return
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass
+
+
+def scrape_shard(
+    shard: list[tuple[int, str]],
+    url: str = DIRECTORY_URL,
+    recycle_after: int = 50,
+    max_attempts: int = 2,
+    headless: bool = True,
+    journal: CrawlJournal | None = None,
+) -> list[tuple[int, dict[str, str]]]:
+    """
+    Scrapes one shard of schools on a dedicated browser.
+    The driver is recycled (quit and recreated) after every `recycle_after` pages, and after
+    any crash; a school whose scrape crashed is retried on the fresh driver up to `max_attempts`
+    times in total before it is recorded with an "issue" key.
+    Args:
+        shard (list[tuple[int, str]]): `(index, school_name)` pairs to scrape.
+        url (str, optional): URL of the school directory page. Defaults to `DIRECTORY_URL`.
+        recycle_after (int, optional): Pages per driver before it is recycled. Defaults to 50.
+        max_attempts (int, optional): Attempts per school. Defaults to 2.
+        headless (bool, optional): Whether to run the browser without a window. Defaults to True.
+        journal (CrawlJournal | None, optional): If given, every record is appended to it as soon
+            as it is extracted. Defaults to None.
+    Returns:
+        list[tuple[int, dict[str, str]]]: `(index, record)` pairs for every school in the shard.
+    """
+
+    results = []
+    driver = None
+    pages = 0
+
+    for index, name in shard:
+        for attempt in range(1, max_attempts + 1):
+            try:
+                if driver is None or pages >= recycle_after:
+                    quit_driver(driver)
+                    driver = create_driver(headless)
+                    driver.get(url)
+                    pages = 0
+
+                record = scrape_school(driver, WebDriverWait(driver, 10), index, name)
+            except (TimeoutException, WebDriverException) as e:
+                log.warning(f"Scrape of {name} failed (attempt {attempt}/{max_attempts}): {e.__class__.__name__}")
+                quit_driver(driver)
+                driver = None
+                record = {'issue': f"Scrape failed: {e.__class__.__name__}"}
+                continue
+
+            pages += 1
+            break
+
+        log.info(f"{index}")
+        results.append((index, record))
+        if journal is not None:
+            journal.append(index, name, record)
+
+    quit_driver(driver)
+
+    return results
+
+
+def run_driver_pool(
+    school_names: list[str] | None = None,
+    workers: int = 4,
+    recycle_after: int = 50,
+    url: str = DIRECTORY_URL,
+    output_path: str | None = "data/school_data.csv",
+    headless: bool = True,
+    journal: CrawlJournal | None = None,
+) -> pd.DataFrame:
+    """
+    Scrapes the directory with a pool of `workers` reusable headless browsers.
+    `school_names` is split into contiguous shards, each scraped by its own driver (see
+    `scrape_shard`). Every browser is a separate process, so the work spreads across cores.
+    The per-worker outputs are merged back into `school_names` order, so the result does not
+    depend on which worker finished first.
+    Args:
+        school_names (list[str] | None, optional): School names in dropdown order. If None, the
+            names are read from "data/school_names.txt".
+        workers (int, optional): Number of browsers. Defaults to 4.
+        recycle_after (int, optional): Pages per driver before it is recycled. Defaults to 50.
+        url (str, optional): URL of the school directory page. Defaults to `DIRECTORY_URL`.
+        output_path (str | None, optional): CSV file to write. Defaults to "data/school_data.csv";
+            None skips writing.
+        headless (bool, optional): Whether to run the browsers without a window. Defaults to True.
+        journal (CrawlJournal | None, optional): If given, schools already finished in the journal
+            are skipped, every new record is appended to it as soon as it is extracted, and the
+            output is rebuilt from the journal. Defaults to None.
+    Returns:
+        pd.DataFrame: A DataFrame with one `get_data` record per school.
+    """
+
+    if school_names is None:
+        with open("data/school_names.txt", "r", encoding="utf-8") as file:
+            school_names = [line.strip() for line in file.readlines()]
+
+    chromedriver_path()  # resolve the driver once, before the workers race to download it
+
+    targets = list(enumerate(school_names))
+    if journal is not None:
+        targets = journal.pending(targets)
+
+    shards = make_shards(targets, workers)
+    log.info(f"Scraping {len(targets)} schools on {len(shards)} browsers")
+
+    with ThreadPoolExecutor(max_workers=len(shards) or 1) as executor:
+        futures = [executor.submit(scrape_shard, shard, url, recycle_after, 2, headless, journal) for shard in shards]
+        results = [pair for future in futures for pair in future.result()]
+
+    if journal is not None:
+        if output_path:
+            journal.to_csv(output_path)
+        return pd.DataFrame(journal.records())
+
+    results.sort(key=lambda pair: pair[0])
+    df = pd.DataFrame([record for _, record in results])
+
+    if output_path:
+        df.to_csv(output_path, index=False, encoding="utf-8")
+
+    return df
+
+
+if __name__ == "__main__":
+    run_driver_pool()
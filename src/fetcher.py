@@ -0,0 +1,293 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+import pandas as pd
+from loguru import logger as log
+
+from .cache import ResponseCache
+from .journal import CrawlJournal
+from .metrics import metrics
+from .scraper import SchoolRecord, get_data, get_data_fast
+
+DIRECTORY_URL = "https://www.ghsa.net/school-directory"
+DROPDOWN_PARAM = "dropdown"  # name of the `#edit-dropdown` <select> in the directory form
+
+
+def create_session(pool_size: int = 16, retries: int = 3) -> requests.Session:
+    """
+    Creates a `requests.Session` backed by a connection pool large enough for `pool_size`
+    concurrent workers, with automatic retries on transient server errors.
+    Args:
+        pool_size (int, optional): Maximum number of pooled connections per host. Defaults to 16.
+        retries (int, optional): Number of retries for connection errors and 429/5xx responses. Defaults to 3.
+    Returns:
+        requests.Session: A session that can be shared between worker threads.
+    """
+
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_school_options(session: requests.Session, url: str = DIRECTORY_URL, timeout: float = 10, cache: ResponseCache | None = None) -> list[tuple[str, str]]:
+    """
+    Requests the directory page and returns the options of its `#edit-dropdown` <select>.
+    Args:
+        session (requests.Session): The HTTP session to use.
+        url (str, optional): URL of the school directory page. Defaults to `DIRECTORY_URL`.
+        timeout (float, optional): Request timeout in seconds. Defaults to 10.
+        cache (ResponseCache | None, optional): Response cache to read from and fill. Defaults to None.
+    Returns:
+        list[tuple[str, str]]: `(value, school_name)` pairs in dropdown order, without the
+            leading placeholder option.
+    Raises:
+        requests.HTTPError: If the directory page cannot be loaded.
+    """
+
+    return parse_school_options(cached_get(session, url, None, timeout, cache))
+
+
+def cached_get(session: requests.Session, url: str, params: dict[str, str] | None = None, timeout: float = 10, cache: ResponseCache | None = None) -> str:
+    """
+    GETs `url` through the response cache and returns the body.
+    A fresh cached body is returned without any request. A stale one is revalidated with
+    `If-None-Match` / `If-Modified-Since`; a 304 answer renews it, anything else replaces it.
+    Args:
+        session (requests.Session): The HTTP session to use.
+        url (str): The URL to request.
+        params (dict[str, str] | None, optional): Query parameters. Defaults to None.
+        timeout (float, optional): Request timeout in seconds. Defaults to 10.
+        cache (ResponseCache | None, optional): Response cache; None always requests. Defaults to None.
+    Returns:
+        str: The response body.
+    Raises:
+        requests.RequestException: If the request fails.
+    """
+
+    entry = cache.get(url, params) if cache is not None else None
+    if entry is not None and entry.fresh:
+        return entry.body
+
+    with metrics.timer("fetch"):
+        response = session.get(url, params=params, timeout=timeout, headers=ResponseCache.conditional_headers(entry))
+    if response.status_code == 304 and entry is not None:
+        cache.touch(entry)
+        return entry.body
+    response.raise_for_status()
+
+    if cache is not None:
+        cache.put(url, params, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return response.text
+
+
+def parse_school_options(html: str) -> list[tuple[str, str]]:
+    """
+    Parses the `#edit-dropdown` <select> out of the directory page HTML.
+    Only the <select> element is parsed (via `SoupStrainer`), not the whole page.
+    Args:
+        html (str): The directory page HTML.
+    Returns:
+        list[tuple[str, str]]: `(value, school_name)` pairs in dropdown order, without the
+            leading placeholder option.
+    """
+
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("select", id="edit-dropdown"))
+    options = []
+    for option in soup.find_all("option"):
+        value = option.get("value", "").strip()
+        if value:
+            options.append((value, option.get_text().strip()))
+
+    return options
+
+
+def match_school_options(options: list[tuple[str, str]], school_names: list[str]) -> list[tuple[int, str, str]]:
+    """
+    Picks the dropdown options for the requested school names.
+    When `school_names` lines up with the dropdown one-to-one (the usual case, since
+    `data/school_names.txt` is saved from the same dropdown) the options are used positionally,
+    which keeps duplicate school names apart. Otherwise the options are matched by name.
+    Args:
+        options (list[tuple[str, str]]): `(value, school_name)` pairs from `get_school_options`.
+        school_names (list[str]): The school names to fetch.
+    Returns:
+        list[tuple[int, str, str]]: `(index, value, school_name)` triples to fetch, in `school_names`
+            order, where `index` is the position of the school in `school_names`.
+    """
+
+    if [name for _, name in options] == school_names:
+        return [(index, value, name) for index, (value, name) in enumerate(options)]
+
+    by_name = {}
+    for value, name in options:
+        by_name.setdefault(name, value)
+
+    matched = []
+    for index, name in enumerate(school_names):
+        if name in by_name:
+            matched.append((index, by_name[name], name))
+        else:
+            log.warning(f"School not found in directory dropdown: {name}")
+
+    return matched
+
+
+def fetch_school(session: requests.Session, value: str, url: str = DIRECTORY_URL, timeout: float = 10, cache: ResponseCache | None = None) -> dict[str, str]:
+    """
+    Requests the directory page for a single dropdown value and extracts its table with `get_data`.
+    Args:
+        session (requests.Session): The HTTP session to use.
+        value (str): The `#edit-dropdown` option value of the school.
+        url (str, optional): URL of the school directory page. Defaults to `DIRECTORY_URL`.
+        timeout (float, optional): Request timeout in seconds. Defaults to 10.
+        cache (ResponseCache | None, optional): Response cache to read from and fill. Defaults to None.
+    Returns:
+        dict[str, str]: The record returned by `get_data`, or a dictionary with an "issue" key
+            if the request failed or the response has no directory table.
+    Raises:
+        Exception: Any other error from decoding or parsing the response (`fetch_all` records it
+            as an issue of the school).
+    """
+
+    try:
+        html = cached_get(session, url, {DROPDOWN_PARAM: value}, timeout, cache)
+    except requests.RequestException as e:
+        log.error(f"Request for {value} failed: {e}")
+        return {'issue': f"Request failed: {e}"}
+
+    return parse_school_table(html)
+
+
+def parse_school_table(html: str, fast: bool = True) -> dict[str, str]:
+    """
+    Extracts the school record from a directory page response.
+    By default the lxml single-pass parser `get_data_fast` is used (it falls back to
+    BeautifulSoup on markup lxml cannot handle); with `fast=False` only the `.directory-table`
+    element is parsed with BeautifulSoup and handed to `get_data`.
+    Args:
+        html (str): The directory page HTML for a single school.
+        fast (bool, optional): Whether to use `get_data_fast`. Defaults to True.
+    Returns:
+        dict[str, str]: The record in the `get_data` shape, or a dictionary with an "issue" key
+            if the response has no directory table.
+    """
+
+    if fast:
+        if "directory-table" not in html:
+            return {'issue': "No directory-table found in response"}
+        with metrics.timer("parse"):
+            record = get_data_fast(html)
+        return record.as_dict() if isinstance(record, SchoolRecord) else record
+
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("table", class_="directory-table"))
+    if not soup.find("table"):
+        return {'issue': "No directory-table found in response"}
+
+    with metrics.timer("parse"):
+        return get_data(soup)
+
+
+def fetch_all(
+    school_names: list[str] | None = None,
+    url: str = DIRECTORY_URL,
+    workers: int = 16,
+    timeout: float = 10,
+    journal: CrawlJournal | None = None,
+    cache: ResponseCache | None = None,
+) -> pd.DataFrame:
+    """
+    Fetches every school's directory table over a pooled HTTP session, without a browser.
+    Requests run concurrently on `workers` threads that share one connection pool; the records
+    are returned in `school_names` order and have the same shape as the Selenium scrape.
+    Args:
+        school_names (list[str] | None, optional): School names to fetch. If None, the names are
+            read from "data/school_names.txt".
+        url (str, optional): URL of the school directory page. Defaults to `DIRECTORY_URL`.
+        workers (int, optional): Number of concurrent requests. Defaults to 16.
+        timeout (float, optional): Per-request timeout in seconds. Defaults to 10.
+        journal (CrawlJournal | None, optional): If given, schools already finished in the journal
+            are skipped, every new record is appended to it as soon as it arrives, and the result
+            is rebuilt from the journal. Defaults to None.
+        cache (ResponseCache | None, optional): Response cache to read from and fill; with a warm
+            cache a rerun makes few or no requests. Defaults to None.
+    Returns:
+        pd.DataFrame: A DataFrame with one `get_data` record per school.
+    Raises:
+        requests.HTTPError: If the directory page itself cannot be loaded.
+        ValueError: If the directory page has no `#edit-dropdown` options.
+    """
+
+    if school_names is None:
+        with open("data/school_names.txt", "r", encoding="utf-8") as file:
+            school_names = [line.strip() for line in file.readlines()]
+
+    session = create_session(pool_size=workers)
+    options = get_school_options(session, url, timeout, cache)
+    if not options:
+        raise ValueError(f"No #edit-dropdown options found at {url}")
+
+    targets = match_school_options(options, school_names)
+    if journal is not None:
+        pending = set(journal.pending([(index, name) for index, _, name in targets]))
+        targets = [target for target in targets if (target[0], target[2]) in pending]
+    log.info(f"Fetching {len(targets)} schools with {workers} workers")
+
+    data = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch_school, session, value, url, timeout, cache): (index, name) for index, value, name in targets}
+        for future in as_completed(futures):
+            index, name = futures[future]
+            try:
+                data[index] = future.result()
+            except Exception as e:
+                # * any other error (a decode or parse failure) stays with its school, so the rest
+                # * of the crawl, the journal and the Selenium fallback still get to run
+                log.error(f"Processing {name} failed: {e!r}")
+                data[index] = {'issue': f"Processing failed: {e!r}", 'school_name': name}
+            if journal is not None:
+                journal.append(index, name, data[index])
+
+    session.close()
+
+    if journal is not None:
+        return pd.DataFrame(journal.records())
+    return pd.DataFrame([data[index] for index in sorted(data)])
+
+
+def replay_cache(cache: ResponseCache, url: str = DIRECTORY_URL) -> pd.DataFrame:
+    """
+    Re-extracts every cached directory table with `get_data`, without a browser or any request.
+    Tables are returned in dropdown order when the directory page itself is cached, otherwise
+    in the order they were cached.
+    Args:
+        cache (ResponseCache): The response cache filled by earlier crawls.
+        url (str, optional): URL of the school directory page. Defaults to `DIRECTORY_URL`.
+    Returns:
+        pd.DataFrame: A DataFrame with one `get_data` record per cached table.
+    """
+
+    order = {}
+    entry = cache.get(url)
+    if entry is not None:
+        order = {value: position for position, (value, _) in enumerate(parse_school_options(entry.body))}
+
+    data = []
+    for _, query, body in cache.entries(url):
+        value = parse_qs(query).get(DROPDOWN_PARAM, [None])[0]
+        if value is not None:
+            data.append((order.get(value, len(order)), parse_school_table(body)))
+
+    data.sort(key=lambda pair: pair[0])
+    return pd.DataFrame([record for _, record in data])
+
+
+if __name__ == "__main__":
+    print(fetch_all())
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .utils import ColorSort
+
+MANIFEST_VERSION = 1
+
+
+def record_keys(df: pd.DataFrame) -> np.ndarray:
+    """
+    Builds a stable identity for every school record: the school name plus its occurrence
+    number among records with the same name, so duplicate names stay apart.
+    """
+
+    occurrence = df.groupby('school_name', sort=False, dropna=False).cumcount()
+    return (df['school_name'].astype(str) + "#" + occurrence.astype(str)).to_numpy(dtype=object)
+
+
+def record_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hashes the content of every record (all columns) to a 64-bit value, as strings for the manifest.
+    """
+
+    return pd.util.hash_pandas_object(df, index=False).to_numpy().astype(str)
+
+
+def reference_fingerprint(reference_colors_lower: set[str], columns: list[str]) -> str:
+    """
+    Fingerprints everything besides the records that the outputs depend on. A manifest with a
+    different fingerprint cannot be updated incrementally.
+    """
+
+    payload = json.dumps([MANIFEST_VERSION, sorted(reference_colors_lower), list(columns)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path: str) -> dict | None:
+    if not Path(path).exists():
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def run_incremental(
+    df: pd.DataFrame,
+    reference_colors_lower: set[str],
+    GROUP_FOLDER_PATH: str,
+    DF_DIFF_PATH: str,
+    MANIFEST_PATH: str,
+) -> dict[str, int]:
+    """
+    Brings the diff file and the grouped CSV files up to date with `df`, recomputing only what
+    changed since the last run.
+    Every record is hashed and compared with the manifest of the last run, which stores each
+    record's hash, whether its colors are all reference colors, and its 'f2_colors' group.
+    Only new and changed records are tokenized; only the groups they leave or join are
+    rewritten (see `ColorSort.update_groups`); and the diff file is rewritten only if a record
+    entered, left or changed inside it. The outputs are identical to a full run of
+    `colorsort.main`. Without a usable manifest (first run, other reference colors or columns,
+    or a folder without a group index) everything is recomputed.
+    Args:
+        df (pd.DataFrame): The school data, with missing colors already dropped.
+        reference_colors_lower (set[str]): A set of reference color names in lowercase.
+        GROUP_FOLDER_PATH (str): Path of the grouped CSV files.
+        DF_DIFF_PATH (str): Path of the CSV file containing rows that were filtered out.
+        MANIFEST_PATH (str): Path of the manifest of the last run.
+    Returns:
+        dict[str, int]: Counts of the run: "rows", "changed" (new or changed records), "removed",
+            "groups_rewritten", "diff_rewritten" (0 or 1) and "full" (0 or 1).
+    """
+
+    keys = record_keys(df)
+    hashes = record_hashes(df)
+    fingerprint = reference_fingerprint(reference_colors_lower, list(df.columns))
+
+    manifest = load_manifest(MANIFEST_PATH)
+    full = (
+        manifest is None
+        or manifest.get("fingerprint") != fingerprint
+        or ColorSort.read_group_index(GROUP_FOLDER_PATH) is None
+    )
+    previous = {} if full else manifest["records"]
+
+    isin_ref = np.zeros(len(df), dtype=bool)
+    f2_colors = np.full(len(df), None, dtype=object)
+    changed = np.ones(len(df), dtype=bool)
+
+    # * Unchanged records keep the mask and group of the last run
+    for i, (key, record_hash) in enumerate(zip(keys, hashes)):
+        entry = previous.get(key)
+        if entry is not None and entry[0] == record_hash:
+            changed[i] = False
+            isin_ref[i], f2_colors[i] = entry[1], entry[2]
+
+    if changed.any():
+        color_columns = ColorSort.vectorized_colors(df['colors'][changed], reference_colors_lower)
+        isin_ref[changed] = color_columns['isin_ref'].to_numpy(dtype=bool)
+        f2_colors[changed] = color_columns['f2_colors'].to_numpy(dtype=object)
+
+    removed = set(previous).difference(keys)
+    stale = [previous[key] for key in removed] + [previous[key] for key in keys[changed] if key in previous]
+    fresh = zip(isin_ref[changed], f2_colors[changed])
+
+    df2 = df[isin_ref].reset_index(drop=True)
+    df2["f2_colors"] = f2_colors[isin_ref]
+
+    if full:
+        Path(GROUP_FOLDER_PATH).mkdir(parents=True, exist_ok=True)
+        for entry in (ColorSort.read_group_index(GROUP_FOLDER_PATH) or {}).values():
+            (Path(GROUP_FOLDER_PATH) / entry["file"]).unlink(missing_ok=True)
+        ColorSort.group_by_f2_colors(df2, GROUP_FOLDER_PATH)
+        groups_rewritten = df2['f2_colors'].nunique()
+        diff_rewritten = True
+    else:
+        affected = {entry[2] for entry in stale if entry[1]} | {color for ref, color in fresh if ref}
+        affected.discard(None)
+        groups_rewritten = ColorSort.update_groups(df2, GROUP_FOLDER_PATH, affected)
+        diff_rewritten = any(not entry[1] for entry in stale) or not isin_ref[changed].all()
+
+    if diff_rewritten:
+        ColorSort.diff_from_mask(df, isin_ref).to_csv(DF_DIFF_PATH, index=False)
+
+    save_manifest(MANIFEST_PATH, {
+        "fingerprint": fingerprint,
+        "records": {
+            key: [record_hash, bool(ref), color]
+            for key, record_hash, ref, color in zip(keys, hashes, isin_ref, f2_colors)
+        },
+    })
+
+    summary = {
+        "rows": len(df),
+        "changed": int(changed.sum()),
+        "removed": len(removed),
+        "groups_rewritten": int(groups_rewritten),
+        "diff_rewritten": int(diff_rewritten),
+        "full": int(full),
+    }
+    print(f"Incremental run: {summary}")
+
+    return summary
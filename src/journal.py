@@ -0,0 +1,173 @@
+import csv
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterator
+
+# * The last line of the journal of a finished crawl
+COMPLETE_MARKER = {"complete": True}
+
+
+class CrawlJournal:
+    """
+    An append-only JSONL progress journal for directory crawls.
+    Every `get_data` record is written (and flushed) as soon as it is extracted, one line per
+    school: `{"index": <position in school_names>, "school": <name>, "record": {...}}`. A school
+    may appear several times (e.g. a failed attempt followed by a retry); the last line wins.
+    Restarts use the journal to skip finished schools and re-queue failed ones (records with an
+    "issue" key), and the final CSV is rebuilt from it in a streaming pass.
+    A crawl that ran to the end is closed with a `{"complete": true}` line (see `complete`), so
+    the next crawl starts a new journal instead of resuming a finished one.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.terminated = False  # whether a crash-truncated last line has been closed off
+
+    def reset(self) -> None:
+        """
+        Discards all journal entries, so the next crawl starts from scratch.
+        """
+
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("", encoding="utf-8")
+            self.terminated = True
+
+    def complete(self) -> None:
+        """
+        Marks the crawl as finished. Call it once the output has been written.
+        """
+
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(COMPLETE_MARKER) + "\n")
+            self.terminated = True
+
+    def completed(self) -> bool:
+        """
+        Returns whether the journal ends with the mark of a finished crawl (see `complete`).
+        """
+
+        if not self.path.exists() or not self.path.stat().st_size:
+            return False
+        marker = (json.dumps(COMPLETE_MARKER) + "\n").encode("utf-8")
+        with open(self.path, "rb") as file:
+            file.seek(max(0, self.path.stat().st_size - len(marker)))
+            return file.read() == marker
+
+    def append(self, index: int, school: str, record: dict[str, str]) -> None:
+        """
+        Appends one record to the journal and flushes it to the OS.
+        Args:
+            index (int): Position of the school in `school_names`.
+            school (str): The school name.
+            record (dict[str, str]): The record returned by `get_data` (or an "issue" record).
+        """
+
+        line = json.dumps({"index": index, "school": school, "record": record}, ensure_ascii=False)
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if not self.terminated:
+                if self.path.exists() and self.path.stat().st_size:
+                    with open(self.path, "rb") as file:
+                        file.seek(-1, os.SEEK_END)
+                        if file.read(1) != b"\n":
+                            line = "\n" + line
+                self.terminated = True
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+                file.flush()
+
+    def latest(self) -> dict[int, tuple[str, int, bool]]:
+        """
+        Scans the journal once and finds the last entry of every school.
+        A truncated last line (from a crash mid-write) is ignored.
+        Returns:
+            dict[int, tuple[str, int, bool]]: `index -> (school, byte offset of the line, ok)`,
+                where `ok` is False for records with an "issue" key.
+        """
+
+        return self._scan()[0]
+
+    def _scan(self) -> tuple[dict[int, tuple[str, int, bool]], list[str]]:
+        latest = {}
+        keys = {}
+        if not self.path.exists():
+            return latest, []
+
+        with open(self.path, "rb") as file:
+            offset = 0
+            for raw in file:
+                try:
+                    entry = json.loads(raw)
+                except json.JSONDecodeError:
+                    entry = None
+                if entry is not None and "index" in entry:  # skips the completion mark
+                    latest[entry["index"]] = (entry["school"], offset, "issue" not in entry["record"])
+                    keys[entry["index"]] = tuple(entry["record"])
+                offset += len(raw)
+
+        fieldnames = {}  # dict as an ordered set, in the order the records are written out
+        for index in sorted(keys):
+            fieldnames.update(dict.fromkeys(keys[index]))
+
+        return latest, list(fieldnames)
+
+    def pending(self, targets: list[tuple[int, str]]) -> list[tuple[int, str]]:
+        """
+        Filters `(index, school_name)` targets down to the ones that still need to be crawled:
+        schools without a journal entry, and schools whose last record has an "issue" key.
+        Args:
+            targets (list[tuple[int, str]]): The `(index, school_name)` pairs of the crawl.
+        Returns:
+            list[tuple[int, str]]: The targets that are not done yet, in their original order.
+        """
+
+        latest = self.latest()
+        done = {index for index, (school, _, ok) in latest.items() if ok}
+        return [(index, name) for index, name in targets if index not in done or latest[index][0] != name]
+
+    def records(self) -> Iterator[dict[str, str]]:
+        """
+        Yields the last record of every school in index order, reading one line at a time.
+        Only the line offsets are kept in memory, not the records.
+        """
+
+        return self._records(self.latest())
+
+    def _records(self, latest: dict[int, tuple[str, int, bool]]) -> Iterator[dict[str, str]]:
+        if not latest:
+            return
+        with open(self.path, "rb") as file:
+            for index in sorted(latest):
+                file.seek(latest[index][1])
+                yield json.loads(file.readline())["record"]
+
+    def to_csv(self, csv_path: str) -> int:
+        """
+        Rebuilds the crawl CSV from the journal in a streaming pass.
+        The columns are the record keys in order of first appearance in the journal, as
+        `pd.DataFrame(records).to_csv(index=False)` would write them.
+        Args:
+            csv_path (str): The CSV file to write.
+        Returns:
+            int: Number of rows written.
+        """
+
+        latest, fieldnames = self._scan()
+
+        rows = 0
+        tmp_path = f"{csv_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames, restval="", lineterminator="\n")
+            writer.writeheader()
+            for record in self._records(latest):
+                writer.writerow(record)
+                rows += 1
+        os.replace(tmp_path, csv_path)
+
+        return rows
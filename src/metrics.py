@@ -0,0 +1,266 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# * Upper bounds (seconds) of the latency histogram buckets, as in the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def peak_rss_mb() -> float | None:
+    """
+    Returns the peak resident set size of the process so far, in MiB (None where unsupported).
+    """
+
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@dataclass
+class StageTiming:
+    """
+    The measurements of one run of a pipeline stage.
+    CPU time is the process CPU time (all threads) spent while the stage ran, and `peak_rss_mb`
+    is the process high-water mark when the stage ended.
+    """
+
+    name: str
+    wall: float = 0.0
+    cpu: float = 0.0
+    peak_rss_mb: float | None = None
+    rows: int | None = None
+
+    @property
+    def rows_per_second(self) -> float | None:
+        if self.rows is None or self.wall <= 0:
+            return None
+        return self.rows / self.wall
+
+
+class Histogram:
+    """
+    A cumulative latency histogram with fixed buckets (see `LATENCY_BUCKETS`).
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """
+        Returns `(upper bound, observations <= bound)` pairs, ending with "+Inf".
+        """
+
+        total = 0
+        pairs = []
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class Metrics:
+    """
+    A registry of stage timings and request latency histograms for the scrape -> sort pipeline.
+    Stages are timed with `stage` (wall time, CPU time, peak RSS and rows per second) and
+    per-request latencies are recorded with `timer` / `observe`. The results can be exported to
+    a JSON file or to a Prometheus text file (see `export`), e.g. for nightly runs.
+    If profiling is turned on with `configure`, every outermost stage also runs under cProfile
+    or pyinstrument and its profile is written to `profile_dir`.
+    The registry is shared by the whole process, so each entry point (`colorsort.main`,
+    `web_automation.automation`) calls `reset` when it starts.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages: list[StageTiming] = []
+        self.histograms: dict[str, Histogram] = {}
+        self.profile: str | None = None
+        self.profile_dir = Path("data/profiles")
+        self.depth = 0
+
+    def configure(self, profile: str | None = None, profile_dir: str = "data/profiles") -> None:
+        """
+        Turns stage profiling on or off.
+        Args:
+            profile (str | None, optional): "cprofile", "pyinstrument" or None (off). Defaults to None.
+            profile_dir (str, optional): Where the profiles are written. Defaults to "data/profiles".
+        Raises:
+            ValueError: If `profile` is not one of the supported profilers.
+        """
+
+        if profile not in (None, "cprofile", "pyinstrument"):
+            raise ValueError(f"Unknown profiler: {profile}")
+        self.profile = profile
+        self.profile_dir = Path(profile_dir)
+
+    def reset(self) -> None:
+        """
+        Discards all recorded stages and histograms.
+        """
+
+        with self.lock:
+            self.stages = []
+            self.histograms = {}
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None) -> Iterator[StageTiming]:
+        """
+        Times a pipeline stage. The number of rows can be given up front or set on the yielded
+        `StageTiming` inside the block (`timing.rows = len(df)`).
+        Stages may be nested; the outer stage's figures include the inner ones.
+        """
+
+        timing = StageTiming(name, rows=rows)
+        profiler = self._start_profiler() if self.profile and self.depth == 0 else None
+        self.depth += 1
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield timing
+        finally:
+            timing.wall = time.perf_counter() - wall
+            timing.cpu = time.process_time() - cpu
+            timing.peak_rss_mb = peak_rss_mb()
+            self.depth -= 1
+            if profiler is not None:
+                self._stop_profiler(profiler, name)
+            with self.lock:
+                self.stages.append(timing)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        Records the duration of the block in the `name` latency histogram.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Records one latency (in seconds) in the `name` histogram. Thread-safe.
+        """
+
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].observe(seconds)
+
+    def _start_profiler(self):
+        if self.profile == "pyinstrument":
+            from pyinstrument import Profiler
+
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _stop_profiler(self, profiler, name: str) -> None:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        if self.profile == "pyinstrument":
+            profiler.stop()
+            (self.profile_dir / f"{name}.txt").write_text(profiler.output_text(), encoding="utf-8")
+        else:
+            profiler.disable()
+            profiler.dump_stats(self.profile_dir / f"{name}.prof")
+
+    def summary(self) -> dict:
+        """
+        Returns the recorded metrics as a dictionary: every stage run (in the order they ended),
+        and count, sum and cumulative buckets of every histogram.
+        """
+
+        with self.lock:
+            stages = [{**asdict(timing), "rows_per_second": timing.rows_per_second} for timing in self.stages]
+            histograms = {
+                name: {"count": histogram.count, "sum": histogram.sum, "buckets": dict(histogram.cumulative())}
+                for name, histogram in self.histograms.items()
+            }
+        return {"stages": stages, "histograms": histograms}
+
+    def to_prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format. Stages that ran several
+        times are summed (peak RSS: maximum).
+        """
+
+        totals = {}
+        for timing in self.summary()["stages"]:
+            total = totals.setdefault(timing["name"], {"wall": 0.0, "cpu": 0.0, "rows": 0, "peak_rss_mb": 0.0})
+            total["wall"] += timing["wall"]
+            total["cpu"] += timing["cpu"]
+            total["rows"] += timing["rows"] or 0
+            total["peak_rss_mb"] = max(total["peak_rss_mb"], timing["peak_rss_mb"] or 0.0)
+
+        lines = []
+        gauges = (
+            ("stage_wall_seconds", "Wall time of a pipeline stage.", lambda t: t["wall"]),
+            ("stage_cpu_seconds", "Process CPU time spent during a pipeline stage.", lambda t: t["cpu"]),
+            ("stage_peak_rss_bytes", "Peak resident set size at the end of a pipeline stage.", lambda t: t["peak_rss_mb"] * 2**20),
+            ("stage_rows", "Rows processed by a pipeline stage.", lambda t: t["rows"]),
+            ("stage_rows_per_second", "Throughput of a pipeline stage.", lambda t: t["rows"] / t["wall"] if t["wall"] > 0 else 0),
+        )
+        for metric, help_text, value in gauges:
+            lines += [f"# HELP school_scraping_{metric} {help_text}", f"# TYPE school_scraping_{metric} gauge"]
+            lines += [f'school_scraping_{metric}{{stage="{name}"}} {value(total):.10g}' for name, total in totals.items()]
+
+        lines += [
+            "# HELP school_scraping_request_seconds Latency of individual requests and parses.",
+            "# TYPE school_scraping_request_seconds histogram",
+        ]
+        with self.lock:
+            for name, histogram in self.histograms.items():
+                for bound, count in histogram.cumulative():
+                    lines.append(f'school_scraping_request_seconds_bucket{{operation="{name}",le="{bound}"}} {count}')
+                lines.append(f'school_scraping_request_seconds_sum{{operation="{name}"}} {histogram.sum:.10g}')
+                lines.append(f'school_scraping_request_seconds_count{{operation="{name}"}} {histogram.count}')
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> None:
+        """
+        Writes the metrics to `path`: Prometheus text for ".prom" / ".txt" files, JSON otherwise.
+        The file is replaced atomically, so a scraper never reads a half-written file.
+        """
+
+        if path.endswith((".prom", ".txt")):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.summary(), indent=1)
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+
+
+# * The process-wide registry the pipeline modules record into
+metrics = Metrics()
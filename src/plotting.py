@@ -0,0 +1,248 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+FIGSIZE = (12, 6)
+BAR_COLOR = "skyblue"
+OTHER_COLOR = "lightcoral"
+
+# * The figure each worker process (or the parent, when rendering serially) draws every chart on
+_figure: Figure | None = None
+
+
+@dataclass
+class ComboChart:
+    """
+    What one bar chart shows: the combos at or above a threshold, then "Other" with the total of
+    the `below` combos under it. Small enough to send to a worker process.
+    """
+
+    name: str
+    labels: list[str]
+    counts: list[int]
+    below: int
+    title: str = "Color Combinations by Row Count"
+
+
+class ComboAggregates:
+    """
+    Group counts sorted once, with a running total, so the chart of any threshold is a binary
+    search and a slice rather than a filter, sort and sum over the whole `grouped_df`.
+    The charts match `ColorSort.get_color_combos` / `ColorSort.plot_color_combos`.
+    """
+
+    def __init__(self, grouped_df: pd.DataFrame):
+        df_sorted = grouped_df.sort_values("count", ascending=False).reset_index(drop=True)
+        self.combos = df_sorted["color_combo"].to_numpy(dtype=object)
+        self.counts = df_sorted["count"].to_numpy(dtype=np.int64)
+        # cumulative[i] is the total of the i largest groups
+        self.cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+
+    def chart(self, threshold: int, name: str | None = None, title: str | None = None) -> ComboChart:
+        """
+        Returns the chart of `threshold`: groups with at least `threshold` rows, plus "Other".
+        """
+
+        above = int(np.searchsorted(-self.counts, -threshold, side="right"))
+        other_total = int(self.cumulative[-1] - self.cumulative[above])
+        return ComboChart(
+            name=name or f"threshold_{threshold}",
+            labels=[*self.combos[:above], "Other"],
+            counts=[*self.counts[:above].tolist(), other_total],
+            below=len(self.counts) - above,
+            title=title or "Color Combinations by Row Count",
+        )
+
+
+def slice_counts(df2: pd.DataFrame, by: str | pd.Series) -> dict[str, pd.DataFrame]:
+    """
+    Counts the rows of every 'f2_colors' group within every slice of the data (e.g. per
+    classification or region), in one groupby.
+    Args:
+        df2 (pd.DataFrame): The filtered data with its 'f2_colors' column.
+        by (str | pd.Series): The column (or a Series aligned with `df2`) to slice on.
+    Returns:
+        dict[str, pd.DataFrame]: The `grouped_df` ("color_combo", "count") of every slice.
+    """
+
+    keys = df2[by] if isinstance(by, str) else by
+    sizes = df2.groupby([keys, df2["f2_colors"]], sort=True).size()
+    return {
+        str(value): group.droplevel(0).rename_axis("color_combo").reset_index(name="count")
+        for value, group in sizes.groupby(level=0)
+    }
+
+
+def draw_chart(figure: Figure, chart: ComboChart) -> None:
+    """
+    Draws `chart` on `figure`, reusing its axes if it already has one. Only the bars and the
+    annotation are replaced, so the tick objects of earlier charts are reused as well.
+    """
+
+    if figure.axes:
+        ax = figure.axes[0]
+        for container in list(ax.containers):
+            container.remove()
+        for text in list(ax.texts):
+            text.remove()
+    else:
+        ax = figure.add_subplot()
+
+    positions = np.arange(len(chart.labels))
+    bars = ax.bar(positions, chart.counts, color=BAR_COLOR)
+    ax.relim()
+    ax.autoscale_view()
+    ax.set_xticks(positions, chart.labels, rotation=45, ha="right")
+    ax.set_title(chart.title)
+    ax.set_ylabel("Row Count")
+
+    # Annotate the 'Other' bar
+    other = len(chart.labels) - 1
+    bars[other].set_color(OTHER_COLOR)
+    ax.text(other, chart.counts[other] + 1, f"{chart.below} combos", ha="center", va="bottom", fontsize=8)
+
+    # tight_layout would measure every tick label on a throwaway draw; the longest label is
+    # enough to size the bottom margin for labels rotated by 45 degrees
+    fontsize = ax.xaxis.get_ticklabels()[0].get_fontsize() if chart.labels else 10
+    label_height = (max(map(len, chart.labels)) * 0.6 + 1) * fontsize / 72 * 0.71 + 0.3
+    height = figure.get_figheight()
+    figure.subplots_adjust(left=0.07, right=0.98, top=1 - 0.5 / height, bottom=min(0.6, label_height / height))
+
+
+def save_chart(chart: ComboChart, path: str, figsize: tuple[float, float] = FIGSIZE, dpi: int = 100) -> None:
+    """
+    Renders a single chart to `path` on a new headless figure; the format follows the extension.
+    """
+
+    figure = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(figure)
+    draw_chart(figure, chart)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    figure.savefig(path)
+
+
+def _init_figure(figsize: tuple[float, float], dpi: int) -> None:
+    global _figure
+    _figure = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(_figure)
+
+
+def _render(chart: ComboChart, output_dir: str, formats: tuple[str, ...]) -> list[str]:
+    # runs in the worker processes, on the worker's own figure
+    draw_chart(_figure, chart)
+    paths = []
+    for extension in formats:
+        path = os.path.join(output_dir, f"{chart.name}.{extension}")
+        _figure.savefig(path, format=extension)
+        paths.append(path)
+    return paths
+
+
+def render_charts(
+    charts: Iterable[ComboChart],
+    output_dir: str,
+    formats: tuple[str, ...] = ("png",),
+    workers: int | None = None,
+    figsize: tuple[float, float] = FIGSIZE,
+    dpi: int = 100,
+) -> list[str]:
+    """
+    Renders charts to image files without a display, on the Agg backend and without the global
+    pyplot state. Each process draws all its charts on a single reused `Figure`. With more than
+    one worker the charts are spread over a process pool.
+    Args:
+        charts (Iterable[ComboChart]): The charts, e.g. from `ComboAggregates.chart`.
+        output_dir (str): Folder for the `<chart name>.<format>` files.
+        formats (tuple[str, ...], optional): File formats, e.g. ("png", "svg"). Defaults to ("png",).
+        workers (int | None, optional): Worker processes. Defaults to the CPU count; 1 renders
+            in this process.
+        figsize (tuple[float, float], optional): Figure size in inches. Defaults to (12, 6).
+        dpi (int, optional): Resolution of raster formats. Defaults to 100.
+    Returns:
+        list[str]: The written files, in chart order.
+    """
+
+    charts = list(charts)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, max(len(charts), 1))
+
+    if workers == 1:
+        _init_figure(figsize, dpi)
+        return [path for chart in charts for path in _render(chart, output_dir, formats)]
+
+    chunksize = max(1, len(charts) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_figure, initargs=(figsize, dpi)) as executor:
+        results = executor.map(_render, charts, [output_dir] * len(charts), [formats] * len(charts), chunksize=chunksize)
+        return [path for paths in results for path in paths]
+
+
+def render_thresholds(
+    grouped_df: pd.DataFrame,
+    thresholds: Iterable[int],
+    output_dir: str,
+    formats: tuple[str, ...] = ("png",),
+    workers: int | None = None,
+) -> list[str]:
+    """
+    Renders the chart of every threshold to `output_dir` as `threshold_<n>.<format>` (see
+    `render_charts`). Thresholds between the same two group sizes give the same chart, so each
+    distinct chart is rendered once and its files are copied for the other thresholds.
+    """
+
+    aggregates = ComboAggregates(grouped_df)
+    charts = {}  # bars above the threshold -> chart
+    names = []
+    for threshold in thresholds:
+        chart = aggregates.chart(threshold)
+        charts.setdefault(len(chart.labels), chart)
+        names.append((len(chart.labels), chart.name))
+
+    rendered = render_charts(charts.values(), output_dir, formats, workers)
+    files = {key: rendered[i * len(formats):(i + 1) * len(formats)] for i, key in enumerate(charts)}
+
+    paths = []
+    for key, name in names:
+        for source, extension in zip(files[key], formats):
+            path = os.path.join(output_dir, f"{name}.{extension}")
+            if path != source:
+                shutil.copyfile(source, path)
+            paths.append(path)
+    return paths
+
+
+def render_slices(
+    df2: pd.DataFrame,
+    by: str | pd.Series,
+    output_dir: str,
+    threshold: int = 10,
+    formats: tuple[str, ...] = ("png",),
+    workers: int | None = None,
+) -> list[str]:
+    """
+    Renders one chart per slice of the data (see `slice_counts`) to `output_dir`.
+    """
+
+    charts = []
+    for value, grouped_df in slice_counts(df2, by).items():
+        name = "".join(c if c.isalnum() or c in "-_" else "_" for c in value)
+        charts.append(ComboAggregates(grouped_df).chart(threshold, name=f"slice_{name}", title=f"Color Combinations: {value}"))
+    return render_charts(charts, output_dir, formats, workers)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from .utils import ColorSort
+
+    # python -m src.plotting data/grouped_data3 data/plots 1 50
+    folder, output, low, high = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+    files = render_thresholds(ColorSort.read_group_data(folder), range(low, high + 1), output)
+    print(f"{len(files)} charts written to {output}")
@@ -1,5 +1,11 @@
+from dataclasses import dataclass, field
+
 from bs4 import BeautifulSoup
 from loguru import logger as log
+import lxml.html
+from lxml import etree
+
+PHONE_LABELS = {"Phone:": "phone", "BD Phone:": "bd_phone", "Fax:": "fax"}
 
 
 def get_data(soup: BeautifulSoup | None = None) -> dict[str, str]:
@@ -66,7 +72,9 @@ def get_data(soup: BeautifulSoup | None = None) -> dict[str, str]:
     colors = "N/A"  # Default value for colors
     for i in range(1, len(tr_all)):
         if tr_all[i].text.startswith("Colors"):
-            colors = tr_all[i].text.split(":")[1].strip()  # Extract colors after ":"
+            _, colon, value = tr_all[i].text.partition(":")  # Extract colors after ":"
+            if colon:
+                colors = value.strip()
             break
     log.info(f"Colors: {colors}")
 
@@ -74,7 +82,9 @@ def get_data(soup: BeautifulSoup | None = None) -> dict[str, str]:
     mascot = "N/A"  # Default value for mascot
     for i in range(1, len(tr_all)):
         if tr_all[i].text.startswith("Mascot"):
-            mascot = tr_all[i].text.split(":")[1].strip()  # Extract mascot after ":"
+            _, colon, value = tr_all[i].text.partition(":")  # Extract mascot after ":"
+            if colon:
+                mascot = value.strip()
             break
     log.info(f"Mascot: {mascot}")
 
@@ -89,5 +99,168 @@ def get_data(soup: BeautifulSoup | None = None) -> dict[str, str]:
     return data
     
 
+@dataclass
+class SchoolRecord:
+    """
+    A school record with every field the directory table provides.
+    `as_dict()` returns the same four keys (and values) as `get_data`; `as_dict(full=True)` adds
+    the contact fields and flattens the personnel list into one string.
+    """
+
+    school_name: str
+    address: str
+    mascot: str = "N/A"
+    colors: str = "N/A"
+    email: str = "N/A"
+    website: str = "N/A"
+    phone: str = "N/A"
+    bd_phone: str = "N/A"
+    fax: str = "N/A"
+    personnel: list[tuple[str, list[str]]] = field(default_factory=list)
+
+    def as_dict(self, full: bool = False) -> dict[str, str]:
+        data = {
+            "school_name": self.school_name,
+            "address": self.address,
+            "mascot": self.mascot,
+            "colors": self.colors,
+        }
+        if full:
+            data.update({
+                "email": self.email,
+                "website": self.website,
+                "phone": self.phone,
+                "bd_phone": self.bd_phone,
+                "fax": self.fax,
+                "personnel": " | ".join(f"{name} ({'; '.join(roles)})" for name, roles in self.personnel),
+            })
+        return data
+
+
+class _LxmlNodes:
+    # node accessors for lxml elements, see `_extract_record`
+    text = staticmethod(lambda el: el.text_content())
+    cells = staticmethod(lambda el: el.findall("td"))
+    links = staticmethod(lambda el: [(a.get("href", ""), a.text_content()) for a in el.iter("a")])
+    list_items = staticmethod(lambda el: [li.text_content().strip() for li in el.iter("li")] if el.find(".//ul") is not None else None)
+
+
+class _SoupNodes:
+    # node accessors for BeautifulSoup tags, see `_extract_record`
+    text = staticmethod(lambda el: el.text)
+    cells = staticmethod(lambda el: el.find_all("td", recursive=False))
+    links = staticmethod(lambda el: [(a.get("href", ""), a.text) for a in el.find_all("a")])
+    list_items = staticmethod(lambda el: [li.text.strip() for li in el.find_all("li")] if el.find("ul") else None)
+
+
+def _extract_record(rows: list, nodes) -> SchoolRecord:
+    """
+    Extracts every field of a directory table in a single pass over its rows.
+    The rows are all <tr> elements of the table in document order (including the nested
+    personnel table), as in `get_data`, and each row's text is computed once.
+    """
+
+    school_name = nodes.text(rows[0]).split('(')[0].strip()
+    record = SchoolRecord(school_name=school_name, address="")
+
+    address = []
+    in_address = True
+    found_colors = found_mascot = False
+
+    for row in rows[1:]:
+        text = nodes.text(row).strip()
+
+        if text.startswith("Colors") or text.startswith("Mascot"):
+            in_address = False
+            # a row without a ":" keeps the "N/A" default
+            _, colon, value = text.partition(":")
+            if text.startswith("Colors") and not found_colors:
+                if colon:
+                    record.colors = value.strip()
+                found_colors = True
+            elif text.startswith("Mascot") and not found_mascot:
+                if colon:
+                    record.mascot = value.strip()
+                found_mascot = True
+            continue
+        if in_address:
+            address.append(text)
+
+        if row.get("class") in ("odd", "even", ["odd"], ["even"]):
+            # personnel row: name cells, each followed by a cell with a <ul> of roles
+            for cell in nodes.cells(row):
+                roles = nodes.list_items(cell)
+                if roles is not None:
+                    if record.personnel:
+                        record.personnel[-1][1].extend(roles)
+                    continue
+                name = nodes.text(cell).strip()
+                if name and cell.get("align") == "left":
+                    record.personnel.append((name, []))
+            continue
+
+        if text.startswith("Email"):
+            mailto = [href for href, _ in nodes.links(row) if href.startswith("mailto:")]
+            _, colon, value = text.partition(":")
+            if mailto:
+                record.email = mailto[0][len("mailto:"):]
+            elif colon:
+                record.email = value.strip()
+        elif "Website" in text and record.website == "N/A":
+            hrefs = [href for href, label in nodes.links(row) if "Website" in label]
+            if hrefs:
+                record.website = hrefs[0]
+        else:
+            cells = nodes.cells(row)
+            if len(cells) == 2:
+                label = nodes.text(cells[0]).strip()
+                if label in PHONE_LABELS:
+                    setattr(record, PHONE_LABELS[label], nodes.text(cells[1]).strip())
+
+    record.address = " ".join(address).strip()
+    return record
+
+
+def get_data_fast(html: str | bytes) -> SchoolRecord | dict[str, str]:
+    """
+    Extracts every field of a directory table with lxml, in a single pass over its rows.
+    On the compact live markup it produces the same school name, address, colors and mascot as
+    `get_data` (see `SchoolRecord.as_dict`), plus the email, website, phone/fax numbers and
+    personnel. On pretty-printed markup such as "data/table.html" the two differ on purpose: row
+    text is stripped before the "Colors"/"Mascot" checks, so this parser still finds both rows
+    and ends the address before them, where `get_data` returns "N/A" colors and mascot and an
+    address that runs on through the rest of the table. Markup that lxml cannot parse into a
+    table is parsed again with BeautifulSoup's "html.parser" backend.
+    Args:
+        html (str | bytes): The HTML of a directory table, or of a page containing a
+            `.directory-table`.
+    Returns:
+        SchoolRecord | dict[str, str]: The extracted record, or a dictionary with an "issue" key
+            if the table has no <tbody> or no <tr> elements.
+    """
+
+    try:
+        root = lxml.html.fromstring(html)
+        tables = root.xpath("descendant-or-self::table[contains(concat(' ', normalize-space(@class), ' '), ' directory-table ')]")
+        scope = tables[0] if tables else root
+        tbody = scope if scope.tag == "tbody" else scope.find(".//tbody")
+        rows = list(tbody.iter("tr")) if tbody is not None else []
+        nodes = _LxmlNodes
+    except (etree.ParserError, ValueError):
+        rows = []
+
+    if not rows:
+        soup = BeautifulSoup(html, "html.parser")
+        tbody = (soup.find("table", class_="directory-table") or soup).find("tbody")
+        if not tbody:
+            return {'issue': "No <tbody> found in table.html"}
+        rows = tbody.find_all("tr")
+        if not rows:
+            return {'issue': "No <tr> elements found in <tbody>"}
+        nodes = _SoupNodes
+
+    return _extract_record(rows, nodes)
+
+
 if __name__ == "__main__":
     print(get_data())
\ No newline at end of file
@@ -0,0 +1,348 @@
+import csv
+import json
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+from .batch_parse import BASE_FIELDS, parse_batch
+from .scraper import SchoolRecord
+from .utils import GROUP_INDEX_NAME, ColorSort
+
+# * A school heading in the PDF directory: "BURKE COUNTY (4-AA)"
+HEADING = re.compile(r"^([A-Z0-9][A-Z0-9 .,'&/\-]*?)\s*\(([^)]+)\)$")
+# * The section after the schools
+SECTION_END = "GHSA APPROVED OFFICIALS ASSOCIATIONS"
+PHONE_FIELDS = {"Phone": "phone", "BD": "bd_phone", "Fax": "fax"}
+CONTACT_LABELS = ("Phone:", "AD:", "BD:", "Fax:", "Cell:")
+# * "Key to School Abbreviations" page of the directory
+ROLE_CODES = {
+    "P": "Principal", "EDIR": "Executive Director", "D": "Dean", "HOS": "Head of School",
+    "H": "Headmaster", "DIR": "Director", "AH": "Assistant Headmaster", "ADIR": "Assistant Director",
+    "AP": "Assistant Principal", "BD": "Band Director", "LC": "Literary Coordinator",
+    "OAP": "One-Act Play", "AD": "Athletic Director", "BF": "Bass Fishing Coach",
+    "ES": "eSports Coach", "DNC": "Dance Coach", "FF": "Flag Football Coach",
+    "1": "Football Coach", "2": "Boys Basketball Coach", "3": "Girls Basketball Coach",
+    "4": "Baseball Coach", "5": "Track Coach", "6": "Tennis Coach", "7": "Golf Coach",
+    "8": "Swimming Coach", "9": "Wrestling Coach", "10": "Gymnastics Coach", "11": "Air Rifle Coach",
+    "12": "Soccer Coach", "13": "Volleyball Coach", "14": "Cross Country Coach",
+    "15F": "Football Cheer Coach", "15B": "Basketball Cheer Coach", "15C": "Competition Cheer Coach",
+    "15G": "Game Day Cheerleading Coach", "16SP": "Slow Pitch Softball Coach",
+    "16FP": "Fast Pitch Softball Coach", "17": "Lacrosse Coach", "18": "Athletic Trainer",
+}
+TEAM_SUFFIXES = {"B": "Boys", "G": "Girls"}
+
+
+def role_name(code: str) -> str | None:
+    """
+    Expands a personnel code of the PDF directory ("AD", "12B", "4*") into a role, or returns
+    None if it is not a code. A "*" marks the head coach, a "B"/"G" suffix the boys/girls team.
+    """
+
+    head = code.endswith("*")
+    code = code.rstrip("*")
+    if code in ROLE_CODES:
+        role = ROLE_CODES[code]
+    elif code[:-1] in ROLE_CODES and code[-1] in TEAM_SUFFIXES:
+        role = f"{TEAM_SUFFIXES[code[-1]]} {ROLE_CODES[code[:-1]]}"
+    else:
+        return None
+    return f"Head {role}" if head else role
+
+
+def _personnel(line: str) -> tuple[str, list[str]] | None:
+    # "Madison Burrell 12B,15B*,15F*" -> ("Madison Burrell", [...]); None for a wrapped fragment
+    name, _, codes = line.rpartition(" ")
+    roles = [role_name(code) for code in codes.split(",")]
+    if not name or None in roles:
+        return None
+    return name.strip(), roles
+
+
+def _is_url(line: str) -> bool:
+    # websites are printed with or without a scheme, but always as a single token
+    return " " not in line and "@" not in line and (line.startswith(("http", "www")) or "." in line)
+
+
+def parse_pdf_block(lines: list[str]) -> SchoolRecord:
+    """
+    Builds a record from the lines of one school in the PDF directory: the heading, the address
+    lines, the contact numbers, website, email, colors and mascot, then one line per person.
+    Lines that wrapped (a long website or colors value, a name split over two lines) are joined back.
+    """
+
+    record = SchoolRecord(school_name=HEADING.match(lines[0]).group(1).strip(), address="")
+    address = []
+    fragment = ""
+    previous = ""
+
+    for line in lines[1:]:
+        label, _, value = line.partition(":")
+        value = value.strip()
+
+        if line.startswith(CONTACT_LABELS):
+            if label in PHONE_FIELDS:
+                setattr(record, PHONE_FIELDS[label], value)
+        elif line.startswith("Colors:"):
+            record.colors = value or record.colors
+        elif line.startswith("Mascot:"):
+            record.mascot = value or record.mascot
+        elif previous.startswith("Colors:") and record.colors.count("(") > record.colors.count(")"):
+            record.colors = f"{record.colors} {line}"  # the colors value wrapped onto this line
+            line = f"Colors: {record.colors}"
+        elif "@" in line and " " not in line:
+            if record.email == "N/A":
+                record.email = line
+        elif " " not in line and previous and record.website.endswith(previous):
+            record.website += line  # the URL wrapped onto this line
+        elif _is_url(line):
+            if record.website == "N/A":
+                record.website = line
+        elif not previous or previous in address:
+            address.append(line)
+        else:
+            person = _personnel(f"{fragment} {line}".strip())
+            if person is None:
+                fragment = f"{fragment} {line}".strip()
+            else:
+                record.personnel.append(person)
+                fragment = ""
+        previous = line
+
+    record.address = " ".join(address)
+    return record
+
+
+def _page_lines(text: str) -> list[str]:
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if line]
+    if lines and lines[-1].isdigit():
+        lines.pop()  # page number
+    return lines
+
+
+def extract_pdf_pages(path: str, start: int, stop: int) -> list[list[str]]:
+    """
+    Extracts the text lines of pages `start` to `stop` (exclusive) of a PDF, without page
+    numbers. Runs in the worker processes.
+    Raises:
+        ImportError: If pypdf is not installed.
+    """
+
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return [_page_lines(reader.pages[number].extract_text()) for number in range(start, min(stop, len(reader.pages)))]
+
+
+def pdf_page_count(path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(path).pages)
+
+
+def iter_pdf_pages(path: str, workers: int | None = None, pages_per_unit: int = 8) -> Iterator[tuple[int, list[str]]]:
+    """
+    Yields `(page number, lines)` for every page of a PDF, in order. Text extraction is spread
+    over a process pool in units of `pages_per_unit` pages, with at most two units per worker in
+    flight, so memory stays flat however long the document is.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    units = iter(range(0, pdf_page_count(path), pages_per_unit))
+
+    if workers == 1:
+        for start in units:
+            yield from enumerate(extract_pdf_pages(path, start, start + pages_per_unit), start=start)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque((start, executor.submit(extract_pdf_pages, path, start, start + pages_per_unit)) for start in islice(units, workers * 2))
+        while in_flight:
+            start, future = in_flight.popleft()
+            pages = future.result()
+            for next_start in islice(units, 1):
+                in_flight.append((next_start, executor.submit(extract_pdf_pages, path, next_start, next_start + pages_per_unit)))
+            yield from enumerate(pages, start=start)
+
+
+def iter_pdf_records(path: str, workers: int | None = None, full: bool = False) -> Iterator[dict[str, str]]:
+    """
+    Stream-parses the schools of the PDF member directory ("data/directory.pdf") page by page.
+    Every school starts with a "NAME (classification)" heading and runs until the next one, which
+    may be pages later; the school section ends at the officials associations.
+    Note that the PDF prints short upper-case names ("BURKE COUNTY") where the website has
+    "Burke County High School"; the address, colors and mascot are as on the website.
+    Args:
+        path (str): The PDF file.
+        workers (int | None, optional): Processes extracting page text. Defaults to the CPU count.
+        full (bool, optional): Whether to include the contact and personnel fields. Defaults to False.
+    Yields:
+        dict[str, str]: One record per school, in the `get_data` shape plus a "source" key
+            ("<file>#page=<n>", 1-based, of the heading).
+    """
+
+    block, block_page = None, 0
+    for number, lines in iter_pdf_pages(path, workers):
+        for line in lines:
+            if line == SECTION_END:
+                if block:
+                    yield _to_record(block, f"{Path(path).name}#page={block_page + 1}", full)
+                return
+            if HEADING.match(line):
+                if block:
+                    yield _to_record(block, f"{Path(path).name}#page={block_page + 1}", full)
+                block, block_page = [line], number
+            elif block is not None:
+                block.append(line)
+
+    if block:
+        yield _to_record(block, f"{Path(path).name}#page={block_page + 1}", full)
+
+
+def _to_record(block: list[str], source: str, full: bool) -> dict[str, str]:
+    data = parse_pdf_block(block).as_dict(full)
+    data["source"] = source
+    return data
+
+
+def open_archive(path: str):
+    """
+    Opens a zip or RAR archive with the same `namelist` / `open` / `read` interface.
+    Raises:
+        ImportError: For a RAR archive, if rarfile is not installed.
+    """
+
+    if zipfile.is_zipfile(path):
+        return zipfile.ZipFile(path)
+
+    import rarfile
+
+    return rarfile.RarFile(path)
+
+
+def archive_group_members(path: str) -> list[str]:
+    """
+    Returns the group CSV members of an archive of grouped CSV files, such as
+    "data/grouped_data3.zip".
+    """
+
+    with open_archive(path) as archive:
+        return sorted(name for name in archive.namelist() if name.endswith(".csv"))
+
+
+def read_archive_group_counts(path: str) -> pd.DataFrame:
+    """
+    Returns the color combinations and their counts ("color_combo", "count") of an archive of
+    grouped CSV files, as `ColorSort.read_group_data` does for a folder: from the group index if
+    the archive has one, otherwise from the member names. No CSV member is read.
+    """
+
+    with open_archive(path) as archive:
+        indexes = [name for name in archive.namelist() if os.path.basename(name) == GROUP_INDEX_NAME]
+        if indexes:
+            group_index = json.loads(archive.read(indexes[0]))
+            return pd.DataFrame([(color, entry["rows"]) for color, entry in group_index.items()], columns=["color_combo", "count"])
+
+    file_data = [ColorSort.parse_group_filename(name) for name in archive_group_members(path)]
+    return pd.DataFrame(file_data, columns=["color_combo", "count"])
+
+
+def read_archive_members(path: str, members: list[str]) -> list[pd.DataFrame]:
+    """
+    Reads some CSV members of an archive straight from the archive, without extracting them.
+    Runs in the worker processes.
+    """
+
+    with open_archive(path) as archive:
+        frames = []
+        for name in members:
+            with archive.open(name) as file:
+                frames.append(pd.read_csv(file))
+        return frames
+
+
+def read_archive_groups(path: str, members: list[str] | None = None, workers: int | None = 1, members_per_unit: int = 32) -> pd.DataFrame:
+    """
+    Reads the rows of grouped CSV files straight out of a zip or RAR archive.
+    Args:
+        path (str): The archive, e.g. "data/grouped_data3.zip".
+        members (list[str] | None, optional): The members to read (see `archive_group_members`).
+            Defaults to all group CSV files.
+        workers (int | None, optional): Processes decompressing and parsing members; None for the
+            CPU count. Defaults to 1 (in this process), which is fastest for small bundles.
+        members_per_unit (int, optional): Members per worker task. Defaults to 32.
+    Returns:
+        pd.DataFrame: The rows of all the members, in member order.
+    Raises:
+        ImportError: For a RAR archive, if rarfile is not installed.
+    """
+
+    members = archive_group_members(path) if members is None else members
+    units = [members[i:i + members_per_unit] for i in range(0, len(members), members_per_unit)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(units) < 2:
+        frames = [frame for unit in units for frame in read_archive_members(path, unit)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            frames = [frame for result in executor.map(read_archive_members, [path] * len(units), units) for frame in result]
+
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def iter_records(source: str, workers: int | None = None, full: bool = False) -> Iterator[dict[str, str]]:
+    """
+    Yields school records from any offline source, in the `get_data` shape plus a "source" key:
+    the PDF member directory, a school data CSV file, or a folder / zip / tar archive of saved
+    directory tables (see `batch_parse.parse_batch`).
+    Args:
+        source (str): A ".pdf" or ".csv" file, a folder or an archive of table HTML files.
+        workers (int | None, optional): Worker processes. Defaults to the CPU count.
+        full (bool, optional): Whether to include the contact and personnel fields (PDF and
+            tables only). Defaults to False.
+    Yields:
+        dict[str, str]: One record per school.
+    """
+
+    if source.lower().endswith(".pdf"):
+        yield from iter_pdf_records(source, workers, full)
+    elif source.lower().endswith(".csv"):
+        for chunk in pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=10_000):
+            for data in chunk.to_dict("records"):
+                data["source"] = source
+                yield data
+    else:
+        yield from parse_batch(source, workers, full=full)
+
+
+def write_school_data(records: Iterator[dict[str, str]], output_path: str) -> int:
+    """
+    Writes records in the `school_data.csv` layout (school_name, address, mascot, colors), so
+    `colorsort.main` can run on data rebuilt offline. The records are streamed to the file one
+    at a time, as `batch_parse.write_records` does. Returns the number of records.
+    """
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=BASE_FIELDS, restval="", extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            rows += 1
+    return rows
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m src.sources data/directory.pdf data/school_data_pdf.csv
+    source, output = sys.argv[1], sys.argv[2]
+    print(f"{write_school_data(iter_records(source), output)} records written to {output}")
@@ -0,0 +1,312 @@
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+
+from .batch_parse import BASE_FIELDS
+from .utils import ColorSort
+
+STORE_PATH = "data/schools.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schools (
+    id INTEGER PRIMARY KEY,
+    school_name TEXT COLLATE NOCASE,
+    address TEXT,
+    mascot TEXT,
+    colors TEXT,
+    city TEXT COLLATE NOCASE,
+    state TEXT,
+    zip TEXT,
+    isin_ref INTEGER NOT NULL DEFAULT 0,
+    f2_colors TEXT
+);
+CREATE TABLE IF NOT EXISTS group_counts (
+    f2_colors TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+INDEXES = {
+    "schools_school_name": "schools (school_name)",
+    "schools_city": "schools (city)",
+    "schools_zip": "schools (zip)",
+    "schools_f2_colors": "schools (f2_colors) WHERE isin_ref",
+}
+
+# * "<street> <city>, GA 30014" / "..., Georgia 31805-1234"
+ADDRESS_TAIL = re.compile(r"^(?P<head>.*?)[\s,]*\b(?P<state>[A-Z]{2}|Georgia)\.?\s+(?P<zip>\d{5})(?:-\d{4})?\s*$", re.IGNORECASE)
+# * Words that end the street part of an address; the city follows the last of them
+STREET_WORDS = {
+    "road", "rd", "street", "st", "drive", "dr", "avenue", "ave", "highway", "hwy", "parkway", "pkwy",
+    "boulevard", "blvd", "lane", "ln", "way", "circle", "cir", "trail", "trl", "court", "ct", "place",
+    "pl", "pike", "box", "nw", "ne", "sw", "se", "n", "s", "e", "w", "north", "south", "east", "west",
+    "terrace", "loop", "run", "path", "square", "plaza", "trace", "crossing", "ridge", "expressway",
+    "route", "rt", "sr", "bypass", "extension", "ext", "suite", "ste", "bend", "alley", "junction",
+    "building", "department", "campus", "center",
+}
+# * Cities whose names contain street words
+COMPOUND_CITIES = ("Blue Ridge", "Social Circle", "East Point", "East Dublin", "West Point", "North Augusta")
+STATES = {"georgia": "GA"}
+ZIP_CODE = re.compile(r"\d{5}(?:-\d{4})?")
+DIGITS_TO_ZERO = str.maketrans("123456789", "000000000")
+
+
+def parse_address(address: str) -> tuple[str | None, str | None, str | None]:
+    """
+    Splits the city, state and ZIP code off a one-line directory address, in which the street
+    and city rows are joined by a space ("5665 New Forsyth Road Macon, GA 31210").
+    The city is taken to be the words after the last street word, house number or comma, in
+    title case if it was all lower or upper case; the ZIP code is returned without its +4 extension.
+    Returns:
+        tuple[str | None, str | None, str | None]: City, two-letter state and ZIP code, or Nones
+            if the address does not end in a state and ZIP code.
+    """
+
+    match = ADDRESS_TAIL.match(address) if isinstance(address, str) else None
+    if match is None:
+        return None, None, None
+    head = match["head"]
+    state = STATES.get(match["state"].lower(), match["state"].upper())
+
+    for city in COMPOUND_CITIES:
+        if head.lower().endswith(city.lower()):
+            return city, state, match["zip"]
+
+    words = []
+    for word in reversed(head.replace(",", " , ").split()):
+        if word == ",":
+            if words:
+                break
+            continue
+        stripped = word.lower().strip(".")
+        if any(char.isdigit() for char in word) or stripped in STREET_WORDS or len(stripped) == 1:
+            break
+        words.insert(0, word)
+    city = " ".join(words)
+    if city.islower() or city.isupper():
+        city = city.title()  # keep "McDonough", fix "franklin" / "MACON"
+    return city or None, state, match["zip"]
+
+
+def parse_addresses(addresses: Iterable[str]) -> list[tuple[str | None, str | None, str | None]]:
+    """
+    `parse_address` for many addresses. The city and state depend only on what follows the last
+    digit before the ZIP code (a house number or highway ends the city), which repeats across the
+    schools of a town even when every street address and ZIP code is unique, so each distinct
+    tail is parsed once.
+    """
+
+    parsed = {}
+    places = []
+    for address in addresses:
+        if not isinstance(address, str):
+            places.append((None, None, None))
+            continue
+        head, _, zip_code = address.rstrip().rpartition(" ")
+        if not ZIP_CODE.fullmatch(zip_code):
+            places.append(parse_address(address))
+            continue
+        last_digit = head.translate(DIGITS_TO_ZERO).rfind("0")
+        # a "0" stands in for the cut-off part, keeping the word it was cut from out of the city
+        tail = head if last_digit < 0 else "0" + head[last_digit + 1:]
+        if tail not in parsed:
+            parsed[tail] = parse_address(f"{tail} 00000")[:2]
+        city, state = parsed[tail]
+        places.append((city, state, zip_code[:5]) if state else (None, None, None))
+    return places
+
+
+class SchoolStore:
+    """
+    An embedded SQLite store of school records and their color groups, so lookups such as
+    "all schools with black, old gold" or "schools in Macon" are indexed queries instead of
+    scans over CSV files.
+    Every school is stored with its city, state and ZIP code (see `parse_address`), whether its
+    colors are all reference colors, and its 'f2_colors' group (see `ColorSort.vectorized_colors`).
+    `school_name`, `city`, `zip` and the 'f2_colors' of the grouped rows are indexed (names and
+    cities case-insensitively), and the row count of every group is kept in the `group_counts`
+    table, updated in the same transaction as every write, so `group_counts()` reads a few
+    hundred rows rather than counting the schools.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.create_indexes()
+
+    def create_indexes(self) -> None:
+        for name, definition in INDEXES.items():
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def write_schools(
+        self,
+        df: pd.DataFrame,
+        reference_colors_lower: set[str],
+        replace: bool = True,
+        color_columns: pd.DataFrame | None = None,
+    ) -> int:
+        """
+        Writes school records to the store.
+        Args:
+            df (pd.DataFrame): Records with the school_name, address, mascot and colors columns
+                (other columns are ignored, as are rows with an "issue").
+            reference_colors_lower (set[str]): A set of reference color names in lowercase.
+            replace (bool, optional): Whether the records replace all stored schools (a full
+                scrape or `school_data.csv`) or are added to them (e.g. newly scraped schools).
+                Defaults to True.
+            color_columns (pd.DataFrame | None, optional): The `ColorSort.vectorized_colors` result
+                for `df['colors']`, if the caller already has it. Defaults to None (computed here).
+        Returns:
+            int: The number of records written.
+        """
+
+        if "issue" in df.columns:
+            keep = df["issue"].isna().to_numpy()
+            df = df[keep]
+            color_columns = None if color_columns is None else color_columns[keep]
+        df = df.reindex(columns=BASE_FIELDS).reset_index(drop=True)
+
+        if color_columns is None:
+            color_columns = ColorSort.vectorized_colors(df["colors"], reference_colors_lower)
+        isin_ref = color_columns["isin_ref"].to_numpy(dtype=bool)
+        f2_colors = color_columns["f2_colors"].to_numpy(dtype=object)
+
+        places = parse_addresses(df["address"].tolist())
+        values = df.astype(object).where(df.notna(), None).to_numpy()
+        rows = [
+            (*row, *place, int(ref), color)
+            for row, place, ref, color in zip(values.tolist(), places, isin_ref.tolist(), f2_colors.tolist())
+        ]
+
+        with self.connection:
+            if replace:
+                # * a bulk load builds each index once at the end instead of row by row
+                self.connection.execute("BEGIN")
+                for name in INDEXES:
+                    self.connection.execute(f"DROP INDEX IF EXISTS {name}")
+                self.connection.execute("DELETE FROM schools")
+                self.connection.execute("DELETE FROM group_counts")
+            self.connection.executemany(
+                "INSERT INTO schools (school_name, address, mascot, colors, city, state, zip, isin_ref, f2_colors) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # * blank colors ("" or " & ") pass the filter but have no group
+            counts = Counter(color for color, ref in zip(f2_colors.tolist(), isin_ref.tolist()) if ref and color is not None)
+            self.connection.executemany(
+                "INSERT INTO group_counts (f2_colors, count) VALUES (?, ?) "
+                "ON CONFLICT (f2_colors) DO UPDATE SET count = count + excluded.count",
+                counts.items(),
+            )
+            if replace:
+                self.create_indexes()
+        return len(rows)
+
+    def add_records(self, records: Iterable[dict[str, str]], reference_colors_lower: set[str]) -> int:
+        """
+        Adds `get_data` records (e.g. from a crawl journal or `sources.iter_records`) to the store.
+        """
+
+        return self.write_schools(pd.DataFrame(list(records)), reference_colors_lower, replace=False)
+
+    def refresh_group_counts(self) -> None:
+        """
+        Rebuilds the `group_counts` table from the schools, e.g. after editing the schools table
+        by hand.
+        """
+
+        with self.connection:
+            self.connection.execute("DELETE FROM group_counts")
+            self.connection.execute(
+                "INSERT INTO group_counts SELECT f2_colors, COUNT(*) FROM schools "
+                "WHERE isin_ref AND f2_colors IS NOT NULL GROUP BY f2_colors"
+            )
+
+    def query(self, sql: str, params: tuple | dict = ()) -> pd.DataFrame:
+        """
+        Runs a read query and returns its rows.
+        """
+
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def group_counts(self) -> pd.DataFrame:
+        """
+        Returns the color combinations and their row counts, as `ColorSort.read_group_data`, for
+        `ColorSort.get_color_combos`.
+        """
+
+        return self.query("SELECT f2_colors AS color_combo, count FROM group_counts ORDER BY f2_colors")
+
+    def group_rows(self, combos: list[str]) -> pd.DataFrame:
+        """
+        Returns the schools of some color combinations, with their 'f2_colors' column, as
+        `ColorSort.read_group_dataset`.
+        """
+
+        placeholders = ", ".join("?" * len(combos))
+        return self.query(
+            f"SELECT {', '.join(BASE_FIELDS)}, f2_colors FROM schools "
+            f"WHERE isin_ref AND f2_colors IN ({placeholders}) ORDER BY id",
+            tuple(combos),
+        )
+
+    def small_groups(self, threshold: int = 10) -> pd.DataFrame:
+        """
+        Returns the schools of the groups with fewer than `threshold` rows, as
+        `ColorSort.merge_small_groups` (without writing a file).
+        """
+
+        return self.query(
+            f"SELECT {', '.join(BASE_FIELDS)}, schools.f2_colors FROM group_counts "
+            "JOIN schools ON schools.f2_colors = group_counts.f2_colors AND schools.isin_ref "
+            "WHERE group_counts.count < ? ORDER BY group_counts.f2_colors, schools.id",
+            (threshold,),
+        )
+
+    def diff_rows(self) -> pd.DataFrame:
+        """
+        Returns the schools whose colors are not all reference colors (the `school_data_diff.csv` rows).
+        """
+
+        return self.query(f"SELECT {', '.join(BASE_FIELDS)} FROM schools WHERE NOT isin_ref AND colors IS NOT NULL ORDER BY id")
+
+    def find(
+        self,
+        school_name: str | None = None,
+        city: str | None = None,
+        zip: str | None = None,
+        f2_colors: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Returns the schools matching all of the given fields (names and cities case-insensitively),
+        using the indexes.
+        """
+
+        conditions, params = [], []
+        for column, value in (("school_name", school_name), ("city", city), ("zip", zip), ("f2_colors", f2_colors)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if f2_colors is not None:
+            conditions.append("isin_ref")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.query(
+            f"SELECT {', '.join(BASE_FIELDS)}, city, state, zip, f2_colors FROM schools {where} ORDER BY id",
+            tuple(params),
+        )
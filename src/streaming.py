@@ -0,0 +1,103 @@
+import hashlib
+import os
+import shutil
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+from .color_index import ColorAliasIndex
+from .utils import ColorSort
+
+
+def stream_colorsort(
+    SCHOOL_DATA_PATH: str,
+    reference_colors_lower: set[str],
+    GROUP_FOLDER_PATH: str,
+    DF_DIFF_PATH: str,
+    chunksize: int = 100_000,
+    alias_index: ColorAliasIndex | None = None,
+) -> dict[str, int]:
+    """
+    Runs the filter, diff and grouping stages of `colorsort.main` over the input in chunks, so
+    peak memory is bounded by `chunksize` rather than by the size of the input.
+    Each chunk is filtered and assigned its 'f2_colors' with `ColorSort.vectorized_colors`; the
+    rows left out are appended to the diff file and every group's rows are appended to a staging
+    file for that group. Only a running row count and sha256 per group are kept in memory. At
+    the end the staging files are renamed to the `<color>_<rows>.csv` names of
+    `group_by_f2_colors` and the group index is written, so the folder matches a full run.
+    All columns are read as text, so values are written back exactly as they appear in the input.
+    Args:
+        SCHOOL_DATA_PATH (str): Path to the input CSV file containing school data.
+        reference_colors_lower (set[str]): A set of reference color names in lowercase.
+        GROUP_FOLDER_PATH (str): Path to save grouped data files.
+        DF_DIFF_PATH (str): Path to save the CSV file containing rows that were filtered out.
+        chunksize (int, optional): Rows read per chunk. Defaults to 100,000.
+        alias_index (ColorAliasIndex | None, optional): If given, the colors column is normalized
+            with it first. Defaults to None.
+    Returns:
+        dict[str, int]: The number of rows of every color combination.
+    """
+
+    folder = Path(GROUP_FOLDER_PATH)
+    staging = folder / ".streaming"
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    counts = Counter()
+    digests = {}
+    staged = {}
+    total = 0
+    diff_header = True
+
+    for chunk in pd.read_csv(SCHOOL_DATA_PATH, chunksize=chunksize, dtype=str):
+        chunk = chunk.dropna(subset=['colors']).reset_index(drop=True)
+        if alias_index is not None:
+            chunk['colors'] = alias_index.normalize_column(chunk['colors'])
+
+        color_columns = ColorSort.vectorized_colors(chunk['colors'], reference_colors_lower)
+        isin_ref = color_columns['isin_ref'].to_numpy()
+
+        ColorSort.diff_from_mask(chunk, isin_ref).to_csv(
+            DF_DIFF_PATH, mode="w" if diff_header else "a", header=diff_header, index=False
+        )
+        diff_header = False
+
+        df2 = chunk[isin_ref].reset_index(drop=True)
+        df2["f2_colors"] = color_columns['f2_colors'].to_numpy()[isin_ref]
+        total += len(df2)
+
+        for color, group in df2.groupby('f2_colors'):
+            first = color not in staged
+            if first:
+                staged[color] = staging / f"{hashlib.sha1(color.encode('utf-8')).hexdigest()}.csv"
+                digests[color] = hashlib.sha256()
+            data = group.to_csv(index=False, header=first).encode("utf-8")
+            with open(staged[color], "ab") as file:
+                file.write(data)
+            digests[color].update(data)
+            counts[color] += len(group)
+
+    # * Replace the previous groups with the staged ones
+    for entry in (ColorSort.read_group_index(GROUP_FOLDER_PATH) or {}).values():
+        (folder / entry["file"]).unlink(missing_ok=True)
+
+    group_index = {}
+    for color in sorted(staged):
+        filename = ColorSort.group_filename(color, counts[color])
+        os.replace(staged[color], folder / filename)
+        group_index[color] = {
+            "file": filename,
+            "rows": counts[color],
+            "bytes": (folder / filename).stat().st_size,
+            "sha256": digests[color].hexdigest(),
+        }
+    ColorSort.write_group_index(GROUP_FOLDER_PATH, group_index)
+    shutil.rmtree(staging)
+
+    print(f"Number of unique colors: {len(group_index)}")
+    print(f"Number of total rows: {total}")
+    print(f"Grouped CSV files saved to {GROUP_FOLDER_PATH}")
+
+    return dict(counts)
@@ -1,9 +1,19 @@
+import hashlib
+import json
 import os
 from pathlib import Path
 import re
+import shutil
 from typing import Tuple
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+
+from .metrics import metrics
+
+GROUP_INDEX_NAME = "_index.json"
+# * The characters `str.strip` removes, spelled out: on the Arrow-backed "str" dtype regexes run
+# * on RE2, whose \s is ASCII-only and would miss e.g. the non-breaking spaces of scraped HTML
+WHITESPACE = "\t-\r\x1c-\x20\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000"
     
 class ColorSort:
     """
@@ -14,15 +24,37 @@ class ColorSort:
         Checks if the colors in the given string are present in the reference set of colors.
     assign_f2_colors(color_string: str) -> str | None
         Assigns and formats the first two colors from the input string, if applicable.
-    get_diff_df(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame
+    vectorized_colors(colors: pd.Series, reference_colors_lower: set[str]) -> pd.DataFrame
+        Computes the color tokens, the reference mask and 'f2_colors' for a whole column in one pass.
+    get_diff_df(df1: pd.DataFrame, df2: pd.DataFrame, columns: list[str] | None = None) -> pd.DataFrame
         Returns the rows that are present in the first DataFrame but not in the second.
+    diff_from_mask(df1: pd.DataFrame, mask: np.ndarray | pd.Series) -> pd.DataFrame
+        Returns the rows of a DataFrame that a boolean filter left out.
     group_by_f2_colors(df2: pd.DataFrame, GROUP_FOLDER_PATH: str) -> None
-        Groups a DataFrame by the 'f2_colors' column and saves each group as a CSV file.
+        Groups a DataFrame by the 'f2_colors' column and saves each group as a CSV file, plus a group index.
+    group_filename(color: str, rows: int) -> str
+        Returns the `<color>_<rows>.csv` file name of a group.
+    parse_group_filename(filename: str) -> tuple[str, int]
+        Returns the color combination (with spaces for underscores) and row count in a group file name.
+    write_group_file(GROUP_FOLDER_PATH: str, color: str, df: pd.DataFrame) -> dict
+        Saves the rows of one color combination as a CSV file and returns its index entry.
+    update_groups(df2: pd.DataFrame, GROUP_FOLDER_PATH: str, colors: set[str]) -> int
+        Rewrites only the given color combinations of a grouped folder and updates its index.
+    write_group_index(GROUP_FOLDER_PATH: str, group_index: dict[str, dict]) -> None
+        Atomically replaces the group index of a folder of grouped CSV files.
+    read_group_index(GROUP_FOLDER_PATH: str) -> dict[str, dict] | None
+        Reads the group index (combo -> file, rows, bytes, sha256) written by `group_by_f2_colors`.
+    write_group_dataset(df2: pd.DataFrame, DATASET_PATH: str) -> dict[str, int]
+        Writes a Parquet dataset partitioned on 'f2_colors', with the group counts in a sidecar file.
+    read_group_dataset(DATASET_PATH: str, combos: list[str] | None = None, columns: list[str] | None = None) -> pd.DataFrame
+        Reads the rows of some (or all) color combinations from a partitioned dataset.
+    read_group_counts(DATASET_PATH: str) -> pd.DataFrame
+        Reads the color combinations and their counts from a dataset's sidecar file.
     read_group_data(file_path: str) -> pd.DataFrame
         Reads grouped CSV files from a directory and returns a DataFrame summarizing the color combinations and their counts.
     get_color_combos(grouped_df: pd.DataFrame, threshold: int = 10) -> Tuple[pd.DataFrame, pd.DataFrame]
         Splits the grouped DataFrame into two: one above the threshold and one below, combining the below-threshold rows into an "Other" category.
-    plot_color_combos(df_final: pd.DataFrame, df_below: pd.DataFrame) -> None
+    plot_color_combos(df_final: pd.DataFrame, df_below: pd.DataFrame, output_path: str | None = None) -> None
         Plots a bar chart of color combinations, highlighting the "Other" category if present.
     merge_small_groups(GROUP_FOLDER_PATH: str, threshold: int = 10) -> pd.DataFrame
         Merges rows of CSV files in the specified folder that have less than the given threshold of rows.
@@ -80,18 +112,112 @@ class ColorSort:
         return ", ".join(matched_colors) if matched_colors else None
     
     @staticmethod
-    def get_diff_df(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
+    def vectorized_colors(colors: pd.Series, reference_colors_lower: set[str]) -> pd.DataFrame:
+        """
+        Tokenizes a colors column once and derives the reference mask and the 'f2_colors' key from it.
+        This is the columnar equivalent of applying `isin_refcolors` and `assign_f2_colors` row by row.
+        Repeated color strings are interned with `pd.factorize`, so each distinct string is split
+        only once, with string methods of the "str" dtype rather than per-group aggregation (which
+        would loop in Python over every distinct string), and the results are broadcast back to the rows.
+        Args:
+            colors (pd.Series): The colors column.
+            reference_colors_lower (set[str]): A set of reference color names in lowercase.
+        Returns:
+            pd.DataFrame: A DataFrame with the index of `colors` and three columns:
+                - "tokens": The lowercase color words (rows with the same string share one list).
+                - "isin_ref": True where `isin_refcolors` would return True; False for missing or
+                  non-string values.
+                - "f2_colors": The value `assign_f2_colors` would return.
+        """
+
+        codes, uniques = pd.factorize(colors, use_na_sentinel=True)
+        uniques = pd.Series(uniques, dtype=object)
+        is_str = uniques.map(lambda x: isinstance(x, str)).to_numpy(dtype=bool)
+
+        # * normalize every separator run (with the spaces around it) to a single ",", so the
+        # * words are the stripped, non-empty pieces between commas; on the "str" dtype (Arrow-backed
+        # * when pyarrow is installed) every step below is a compute kernel, not a Python loop
+        normalized = (
+            uniques.where(is_str).astype("str")
+            .str.lower()
+            .str.replace(f"[{WHITESPACE}]*[,&][{WHITESPACE},&]*", ",", regex=True)
+            .str.strip()
+            .str.strip(",")
+        )
+        first = normalized.str.replace(r",.*", "", regex=True)
+        second = normalized.str.replace(r"^[^,]*,?", "", regex=True).str.replace(r",.*", "", regex=True)
+        first2 = normalized.str.replace(r"^([^,]*(?:,[^,]*)?).*$", r"\1", regex=True).str.replace(",", ", ", regex=False)
+
+        n = len(uniques)
+        tokens = normalized.where(normalized != "").str.split(",").map(lambda x: x if isinstance(x, list) else [])
+        isin_ref = ((first == "") | first.isin(reference_colors_lower)) & ((second == "") | second.isin(reference_colors_lower))
+        isin_ref = isin_ref.to_numpy(dtype=bool, na_value=False) & is_str
+        f2_colors = first2.where(first2 != "").to_numpy(dtype=object, na_value=None)
+
+        # * broadcast the per-unique results back to the rows (code -1 marks missing values)
+        missing = codes < 0
+        codes = np.where(missing, 0, codes)
+        if n == 0:
+            return pd.DataFrame({"tokens": None, "isin_ref": False, "f2_colors": None}, index=colors.index, dtype=object).astype({"isin_ref": bool})
+
+        return pd.DataFrame(
+            {
+                "tokens": pd.Series(np.where(missing, None, tokens.to_numpy(dtype=object)[codes]), index=colors.index, dtype=object),
+                "isin_ref": np.where(missing, False, isin_ref[codes]),
+                "f2_colors": pd.Series(np.where(missing, None, f2_colors[codes]), index=colors.index, dtype=object),
+            },
+            index=colors.index,
+        )
+
+    @staticmethod
+    def get_diff_df(df1: pd.DataFrame, df2: pd.DataFrame, columns: list[str] | None = None) -> pd.DataFrame:
         """
         Computes the difference between two DataFrames by returning rows that are 
         present in the first DataFrame (df1) but not in the second DataFrame (df2).
+        Rows are matched by identity over `columns` (an anti-join), with multiset semantics:
+        a row that occurs n times in df1 and m times in df2 is returned max(n - m, 0) times.
+        Each column is factorized (hashed) once over both frames and the codes are folded into a
+        single integer row key, so only integer arrays are compared and no merged copy of the
+        frames is built. Missing values match each other, as in `merge`.
         Args:
             df1 (pd.DataFrame): The first DataFrame.
             df2 (pd.DataFrame): The second DataFrame.
+            columns (list[str] | None, optional): The columns that identify a row. Defaults to the
+                columns the two DataFrames share.
         Returns:
-            pd.DataFrame: A DataFrame containing rows that are unique to df1.
+            pd.DataFrame: A DataFrame containing rows that are unique to df1, in df1 order.
         """
 
-        return df1.merge(df2, how='outer', indicator=True).query('_merge == "left_only"').drop(columns=['_merge'])
+        if columns is None:
+            columns = [column for column in df1.columns if column in df2.columns]
+
+        keys = np.zeros(len(df1) + len(df2), dtype=np.int64)
+        for column in columns:
+            codes, uniques = pd.factorize(pd.concat([df1[column], df2[column]], ignore_index=True), use_na_sentinel=False)
+            # * Re-factorizing keeps the folded key below the row count, so it cannot overflow
+            keys, _ = pd.factorize(keys * len(uniques) + codes)
+        keys1, keys2 = keys[:len(df1)], keys[len(df1):]
+
+        # * How many copies of each df1 row df2 accounts for, and which copy of it each row is
+        matched = np.bincount(keys2, minlength=len(keys))[keys1]
+        occurrence = pd.Series(keys1).groupby(keys1, sort=False).cumcount().to_numpy()
+
+        return df1[occurrence >= matched].reset_index(drop=True)
+
+    @staticmethod
+    def diff_from_mask(df1: pd.DataFrame, mask: np.ndarray | pd.Series) -> pd.DataFrame:
+        """
+        Returns the rows of df1 that a boolean filter left out, i.e. the difference between df1
+        and `df1[mask]`. This is the cheapest diff when the filter mask is still at hand, and it
+        keeps duplicate rows exactly as they appear in df1.
+        Args:
+            df1 (pd.DataFrame): The DataFrame that was filtered.
+            mask (np.ndarray | pd.Series): The boolean mask that selected the kept rows.
+        Returns:
+            pd.DataFrame: A DataFrame containing the rows where `mask` is False, in df1 order.
+        """
+
+        return df1[~np.asarray(mask, dtype=bool)].reset_index(drop=True)
 
     @staticmethod
     def group_by_f2_colors(df2: pd.DataFrame, GROUP_FOLDER_PATH: str) -> None:
@@ -110,6 +236,8 @@ class ColorSort:
             - The filenames of the saved CSV files are generated based on the color name, with spaces 
               and special characters replaced by underscores or other substitutions.
             - The filenames also include the number of rows in each group.
+            - A group index (`_index.json`) maps every color combination to its file, row count,
+              size in bytes and sha256, so readers never need to parse filenames or open the files.
         """
         
         grouped_data = df2.groupby('f2_colors')
@@ -120,14 +248,202 @@ class ColorSort:
         print(f"Number of unique colors: {len(grouped_dfs.keys())}")
         print(f"Number of total rows: {len(df2)}")
 
-        for color, df in grouped_dfs.items():
-            # Replace spaces and special characters in the color string with underscores
-            filename = f"{color.replace(' ', '_').replace('&', 'and').replace(',', '').replace('/', '_')}_{len(df)}.csv"
-            # Save the DataFrame to a CSV file
-            df.to_csv(f"{GROUP_FOLDER_PATH}/{filename}", index=False)
+        with metrics.stage("write", rows=len(df2)):
+            group_index = {}
+            for color, df in grouped_dfs.items():
+                group_index[color] = ColorSort.write_group_file(GROUP_FOLDER_PATH, color, df)
+
+            ColorSort.write_group_index(GROUP_FOLDER_PATH, group_index)
         
         print(f"Grouped CSV files saved to {GROUP_FOLDER_PATH}")
+
+    @staticmethod
+    def group_filename(color: str, rows: int) -> str:
+        """
+        Returns the file name of a group: `<color>_<rows>.csv`, with spaces and special
+        characters in the color string replaced.
+        """
+
+        # Replace spaces and special characters in the color string with underscores
+        return f"{color.replace(' ', '_').replace('&', 'and').replace(',', '').replace('/', '_')}_{rows}.csv"
+
+    @staticmethod
+    def parse_group_filename(filename: str) -> tuple[str, int]:
+        """
+        Returns the color combination and the row count in a `<color>_<rows>.csv` group file
+        name. Underscores come back as spaces; commas dropped by `group_filename` are not restored.
+        """
+
+        # Remove `.csv` and split at the last underscore
+        *color_parts, count = os.path.basename(filename)[:-4].split('_')
+        return '_'.join(color_parts).replace('_', ' '), int(count)
+
+    @staticmethod
+    def write_group_file(GROUP_FOLDER_PATH: str, color: str, df: pd.DataFrame) -> dict:
+        """
+        Saves the rows of one color combination as `<color>_<rows>.csv`.
+        Args:
+            GROUP_FOLDER_PATH (str): The directory path where the grouped CSV files are saved.
+            color (str): The 'f2_colors' value of the group.
+            df (pd.DataFrame): The rows of the group.
+        Returns:
+            dict: The group's index entry: {"file", "rows", "bytes", "sha256"}.
+        """
+
+        filename = ColorSort.group_filename(color, len(df))
+        # Save the DataFrame to a CSV file
+        data = df.to_csv(index=False).encode("utf-8")
+        with open(f"{GROUP_FOLDER_PATH}/{filename}", "wb") as file:
+            file.write(data)
+
+        return {"file": filename, "rows": len(df), "bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+    @staticmethod
+    def update_groups(df2: pd.DataFrame, GROUP_FOLDER_PATH: str, colors: set[str]) -> int:
+        """
+        Rewrites only the given color combinations of a grouped folder, as `group_by_f2_colors`
+        would write them for `df2`, and updates the group index. Groups that no longer have rows
+        are deleted; the files of all other groups are left untouched.
+        Args:
+            df2 (pd.DataFrame): The full input DataFrame containing a column named 'f2_colors'.
+            GROUP_FOLDER_PATH (str): The directory containing the grouped CSV files and their index.
+            colors (set[str]): The 'f2_colors' values whose groups changed.
+        Returns:
+            int: Number of group files written.
+        """
+
+        group_index = ColorSort.read_group_index(GROUP_FOLDER_PATH) or {}
+        selected = df2[df2['f2_colors'].isin(colors)]
+        grouped_dfs = {color: group.reset_index(drop=True) for color, group in selected.groupby('f2_colors')}
+
+        for color in colors:
+            old = group_index.pop(color, None)
+            if old is not None:
+                (Path(GROUP_FOLDER_PATH) / old["file"]).unlink(missing_ok=True)
+            if color in grouped_dfs:
+                group_index[color] = ColorSort.write_group_file(GROUP_FOLDER_PATH, color, grouped_dfs[color])
+
+        # * keep the index in groupby order, as a full rewrite would
+        ColorSort.write_group_index(GROUP_FOLDER_PATH, dict(sorted(group_index.items())))
+
+        return len(grouped_dfs)
+
+    @staticmethod
+    def write_group_index(GROUP_FOLDER_PATH: str, group_index: dict[str, dict]) -> None:
+        """
+        Atomically replaces the group index of a folder of grouped CSV files.
+        Args:
+            GROUP_FOLDER_PATH (str): The directory containing the grouped CSV files.
+            group_index (dict[str, dict]): combo -> {"file", "rows", "bytes", "sha256"}.
+        """
+
+        index_path = Path(GROUP_FOLDER_PATH) / GROUP_INDEX_NAME
+        tmp_path = index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(group_index, file, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, index_path)
+
+    @staticmethod
+    def read_group_index(GROUP_FOLDER_PATH: str) -> dict[str, dict] | None:
+        """
+        Reads the group index written by `group_by_f2_colors`.
+        Args:
+            GROUP_FOLDER_PATH (str): The directory containing the grouped CSV files.
+        Returns:
+            dict[str, dict] | None: combo -> {"file", "rows", "bytes", "sha256"}, or None for a
+                folder written before group indexes existed.
+        """
+
+        index_path = Path(GROUP_FOLDER_PATH) / GROUP_INDEX_NAME
+        if not index_path.exists():
+            return None
+        with open(index_path, "r", encoding="utf-8") as file:
+            return json.load(file)
     
+    @staticmethod
+    def write_group_dataset(df2: pd.DataFrame, DATASET_PATH: str) -> dict[str, int]:
+        """
+        Writes a DataFrame as a Parquet dataset partitioned on the 'f2_colors' column, in a
+        single pass: one `f2_colors=<combo>/` directory per color combination (hive layout,
+        with the combo URI-encoded), so no combo is ever mangled into a filename.
+        The group counts are written to a `_group_counts.json` sidecar next to the partitions.
+        Args:
+            df2 (pd.DataFrame): The input DataFrame containing a column named 'f2_colors'.
+            DATASET_PATH (str): The dataset directory. An existing dataset there is replaced.
+        Returns:
+            dict[str, int]: The number of rows of every color combination.
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if Path(DATASET_PATH).exists():
+            shutil.rmtree(DATASET_PATH)
+
+        ds.write_dataset(
+            pa.Table.from_pandas(df2, preserve_index=False),
+            DATASET_PATH,
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("f2_colors", pa.string())]), flavor="hive"),
+            basename_template="part-{i}.parquet",
+        )
+
+        counts = {combo: int(count) for combo, count in df2['f2_colors'].value_counts(sort=False).items()}
+        with open(Path(DATASET_PATH) / "_group_counts.json", "w", encoding="utf-8") as file:
+            json.dump({"rows": len(df2), "groups": counts}, file, ensure_ascii=False, indent=1)
+
+        print(f"Number of unique colors: {len(counts)}")
+        print(f"Number of total rows: {len(df2)}")
+        print(f"Grouped dataset saved to {DATASET_PATH}")
+
+        return counts
+
+    @staticmethod
+    def read_group_dataset(DATASET_PATH: str, combos: list[str] | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Reads rows from a dataset written by `write_group_dataset`.
+        The combo filter is applied to the partition paths, so only the files of the requested
+        combinations are opened.
+        Args:
+            DATASET_PATH (str): The dataset directory.
+            combos (list[str] | None, optional): The color combinations to load. Defaults to all.
+            columns (list[str] | None, optional): The columns to load. Defaults to all.
+        Returns:
+            pd.DataFrame: The matching rows, with the 'f2_colors' column last.
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(
+            DATASET_PATH,
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("f2_colors", pa.string())]), flavor="hive"),
+        )
+        predicate = ds.field("f2_colors").isin(list(combos)) if combos is not None else None
+
+        return dataset.to_table(columns=columns, filter=predicate).to_pandas()
+
+    @staticmethod
+    def read_group_counts(DATASET_PATH: str) -> pd.DataFrame:
+        """
+        Reads the group counts of a dataset written by `write_group_dataset` from its sidecar
+        file, without opening any data file.
+        Args:
+            DATASET_PATH (str): The dataset directory.
+        Returns:
+            pd.DataFrame: A DataFrame with "color_combo" and "count" columns, as `read_group_data` returns.
+        """
+
+        with open(Path(DATASET_PATH) / "_group_counts.json", "r", encoding="utf-8") as file:
+            counts = json.load(file)["groups"]
+
+        return pd.DataFrame(list(counts.items()), columns=["color_combo", "count"])
+
     @staticmethod
     def read_group_data(file_path: str) -> pd.DataFrame:
         """
@@ -137,6 +453,8 @@ class ColorSort:
         The filenames are expected to follow the format: `<color_combo>_<count>.csv`, 
         where `<color_combo>` is a string representing a combination of colors 
         (with underscores as separators), and `<count>` is an integer.
+        If the folder has a group index (see `group_by_f2_colors`), the combos and counts are
+        taken from it instead, with the combos exactly as in the 'f2_colors' column.
         Args:
             file_path (str): The path to the directory containing the CSV files.
         Returns:
@@ -146,15 +464,17 @@ class ColorSort:
                 - "count": The integer count extracted from the filename.
         """
         
+        group_index = ColorSort.read_group_index(file_path)
+        if group_index is not None:
+            # * The index has the exact combos and counts; no filename parsing, no file access
+            file_data = [(color, entry["rows"]) for color, entry in group_index.items()]
+            return pd.DataFrame(file_data, columns=["color_combo", "count"])
+
         file_data = []
 
         for filename in os.listdir(file_path):
             if filename.endswith(".csv"):
-                # Remove `.csv` and split at the last underscore
-                name = filename[:-4]
-                *color_parts, count = name.split('_')
-                color = '_'.join(color_parts)
-                file_data.append((color.replace('_', ' '), int(count)))
+                file_data.append(ColorSort.parse_group_filename(filename))
 
         grouped_df = pd.DataFrame(file_data, columns=["color_combo", "count"])
         
@@ -188,7 +508,7 @@ class ColorSort:
         return df_final, df_below
     
     @staticmethod
-    def plot_color_combos(df_final: pd.DataFrame, df_below: pd.DataFrame) -> None:
+    def plot_color_combos(df_final: pd.DataFrame, df_below: pd.DataFrame, output_path: str | None = None) -> None:
         """
         Plots a bar chart to visualize color combinations and their row counts.
         Parameters:
@@ -200,18 +520,38 @@ class ColorSort:
         df_below : pd.DataFrame
             A DataFrame containing additional details for the "Other" category,
             specifically the color combinations that were grouped into "Other".
+        output_path : str | None, optional
+            If given, the chart is rendered headless (Agg backend, no pyplot state) and saved
+            to this file, e.g. "plot.png" or "plot.svg", instead of being drawn on a pyplot figure.
         Returns:
         --------
         None
-            This function does not return any value. It displays a bar chart.
+            This function does not return any value. It displays (or saves) a bar chart.
         Notes:
         ------
         - The bar corresponding to the "Other" category (if present) is highlighted
           in a different color (light coral) and annotated with the number of
           combinations it represents.
         - The x-axis labels are rotated for better readability.
+        - Use `src.plotting.render_thresholds` to render many thresholds in parallel.
+        - matplotlib is imported here rather than with the module, so runs that do not plot
+          do not pay for it.
         """
         
+        if output_path is not None:
+            from .plotting import ComboChart, save_chart
+
+            chart = ComboChart(
+                name=Path(output_path).stem,
+                labels=df_final["color_combo"].tolist(),
+                counts=df_final["count"].tolist(),
+                below=len(df_below),
+            )
+            save_chart(chart, output_path)
+            return
+
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(12, 6))
         bars = plt.bar(df_final["color_combo"], df_final["count"], color="skyblue")
         plt.xticks(rotation=45, ha='right')
@@ -222,7 +562,6 @@ class ColorSort:
         # Annotate the 'Other' bar
         if "Other" in df_final["color_combo"].values:
             idx = df_final[df_final["color_combo"] == "Other"].index[0]
-            combos = ", ".join(df_below["color_combo"].tolist())
             bars[idx].set_color("lightcoral")
             plt.text(idx, df_final["count"].iloc[idx] + 1, f"{len(df_below)} combos", ha='center', va='bottom', fontsize=8)
     
@@ -236,20 +575,28 @@ class ColorSort:
         Returns:
             pd.DataFrame: A DataFrame containing the merged rows from all small groups.
         Side Effects:
-            - Reads CSV files from the specified folder.
+            - Reads CSV files from the specified folder. With a group index, only the files that
+              get merged are read; otherwise every file is read to count its rows.
             - Merges rows from files with fewer rows than the threshold.
         Notes:
             - The function assumes that the CSV files have a consistent structure.
         """
         merged_data = []
 
-        for filename in os.listdir(GROUP_FOLDER_PATH):
-            if filename.endswith(".csv"):
-                file_dir = Path(GROUP_FOLDER_PATH) / filename
-                df = pd.read_csv(file_dir)
+        group_index = ColorSort.read_group_index(GROUP_FOLDER_PATH)
+        if group_index is not None:
+            # * Pick the small groups from the index and read only those files
+            for entry in group_index.values():
+                if entry["rows"] < threshold:
+                    merged_data.append(pd.read_csv(Path(GROUP_FOLDER_PATH) / entry["file"]))
+        else:
+            for filename in os.listdir(GROUP_FOLDER_PATH):
+                if filename.endswith(".csv"):
+                    file_dir = Path(GROUP_FOLDER_PATH) / filename
+                    df = pd.read_csv(file_dir)
 
-                if len(df) < threshold:
-                    merged_data.append(df)
+                    if len(df) < threshold:
+                        merged_data.append(df)
 
         if merged_data:
             merged_df = pd.concat(merged_data, ignore_index=True)
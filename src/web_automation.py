@@ -1,22 +1,206 @@
+import asyncio
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import aiohttp
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 from bs4 import BeautifulSoup
 import pandas as pd
+import requests
 from loguru import logger as log
 
+from .cache import ResponseCache
+from .colorsort import REFERENCE_COLORS
+from .crawler import crawl
+from .fetcher import DIRECTORY_URL, fetch_all
+from .journal import CrawlJournal
+from .metrics import metrics
 from .scraper import get_data
+from .store import SchoolStore
+
+# * Share of "issue" records above which an HTTP fetch counts as failed (e.g. the site ignores
+# * the dropdown GET parameter and every response comes back without a directory table)
+MAX_ISSUE_SHARE = 0.5
+# * Where the resolved ChromeDriver path is remembered between runs
+DRIVER_PATH_CACHE = "data/cache/chromedriver_path.txt"
+
+@lru_cache(maxsize=None)
+def chromedriver_path() -> str:
+    """
+    Resolves the ChromeDriver binary once per process. The path is remembered in
+    DRIVER_PATH_CACHE, so `ChromeDriverManager().install()` (a version check over the network,
+    and a download on the first run) only runs again when the remembered binary is gone.
+    Returns:
+        str: Path to the ChromeDriver executable.
+    """
+
+    cache = Path(DRIVER_PATH_CACHE)
+    if cache.exists():
+        path = cache.read_text(encoding="utf-8").strip()
+        if path and os.path.isfile(path):
+            return path
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    cache.write_text(path, encoding="utf-8")
+    return path
+
+
+def create_driver(headless: bool = True) -> webdriver.Chrome:
+    """
+    Creates a Chrome WebDriver for scraping the directory.
+    Args:
+        headless (bool, optional): Whether to run the browser without a window. Defaults to True.
+    Returns:
+        webdriver.Chrome: A new Chrome WebDriver instance.
+    Raises:
+        WebDriverException: If there is an issue initializing the Selenium WebDriver.
+    """
+
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless")  # Remove to see browser actions
+    service = Service(chromedriver_path())
+    return webdriver.Chrome(service=service, options=options)
+
+
+def automation(
+    engine: str = "http",
+    workers: int = 16,
+    journal_path: str | None = "data/school_data.jsonl",
+    resume: bool = True,
+    cache_dir: str | None = "data/cache",
+    metrics_path: str | None = None,
+    store_path: str | None = None,
+    output_path: str = "data/school_data.csv",
+) -> pd.DataFrame:
+    """
+    Scrapes school data from the GHSA school directory website and saves it to `output_path`.
+    The default "http" engine requests each school's directory table directly over a pooled
+    HTTP session (see `fetcher.fetch_all`); the "async" engine does the same with the
+    rate-limited asyncio scheduler in `crawler.crawl`. If either fails, or if `engine` is
+    "selenium", the browser-driven scrape in `selenium_automation` is used instead. The "pool"
+    engine runs the browser scrape on several headless browsers (see `driver_pool.run_driver_pool`).
+    Every record is appended to a progress journal (see `journal.CrawlJournal`) as soon as it is
+    extracted. A rerun after a crash skips the schools already in the journal, retries the failed
+    ones, and rebuilds the CSV from the journal. Once the CSV is written the journal is marked
+    complete, so the next run crawls every school again (and revalidates the cached responses).
+    Args:
+        engine (str, optional): "http", "async", "selenium" or "pool". Defaults to "http".
+        workers (int, optional): Number of concurrent requests for the "http" and "async" engines,
+            or number of browsers for the "pool" engine. Defaults to 16.
+        journal_path (str | None, optional): Path of the progress journal. Defaults to
+            "data/school_data.jsonl"; None disables journaling.
+        resume (bool, optional): Whether to resume from the journal of an unfinished crawl. If
+            False, or if the last crawl finished, the journal is cleared first. Defaults to True.
+        cache_dir (str | None, optional): Directory of the HTTP response cache used by the "http"
+            and "async" engines (see `cache.ResponseCache`). Defaults to "data/cache"; None
+            disables caching.
+        metrics_path (str | None, optional): If given, the "scrape" stage timing and the fetch /
+            wait-for-table / parse latency histograms are exported there (JSON, or Prometheus
+            text for ".prom" files; see `metrics.Metrics.export`). Defaults to None.
+        store_path (str | None, optional): If given, the scraped records also replace the schools
+            of the SQLite store there (see `store.SchoolStore`), with their color groups.
+            Defaults to None.
+        output_path (str, optional): CSV file to write. Defaults to "data/school_data.csv".
+    Returns:
+        pd.DataFrame: A DataFrame containing the scraped school data.
+    Raises:
+        ValueError: If `engine` is not "http", "async", "selenium" or "pool".
+    Notes:
+        - With a journal, the "selenium" engine runs as a single-browser pool, because the
+          ARROW_DOWN loop of `selenium_automation` cannot skip schools that are already done.
+    """
+
+    if engine not in ("http", "async", "selenium", "pool"):
+        raise ValueError(f"Unknown engine: {engine}")
+
+    # * the registry is process-wide: start from empty, so the export holds this run only
+    metrics.reset()
+    try:
+        with metrics.stage("scrape") as timing:
+            df = _automation(engine, workers, journal_path, resume, cache_dir, output_path)
+            timing.rows = len(df)
+        if store_path:
+            with SchoolStore(store_path) as store:
+                store.write_schools(df, {color.lower() for color in REFERENCE_COLORS})
+    finally:
+        if metrics_path:
+            metrics.export(metrics_path)
+
+    return df
+
+
+def _automation(
+    engine: str, workers: int, journal_path: str | None, resume: bool, cache_dir: str | None, output_path: str
+) -> pd.DataFrame:
+    journal = CrawlJournal(journal_path) if journal_path else None
+    if journal is not None and (not resume or journal.completed()):
+        # * resume only a crawl that did not finish; a finished one is crawled again from scratch
+        journal.reset()
+
+    df = _scrape(engine, workers, journal, cache_dir, output_path)
+    if journal is not None:
+        journal.complete()
+    return df
+
+
+def _scrape(engine: str, workers: int, journal: CrawlJournal | None, cache_dir: str | None, output_path: str) -> pd.DataFrame:
 
-def automation() -> pd.DataFrame:
+    if engine in ("http", "async"):
+        cache = ResponseCache(cache_dir) if cache_dir else None
+        try:
+            if engine == "http":
+                df = fetch_all(workers=workers, journal=journal, cache=cache)
+            else:
+                df = crawl(concurrency=workers, journal=journal, cache=cache)
+            check_records(df)
+        except (requests.RequestException, aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            log.warning(f"HTTP fetch failed ({e}), falling back to Selenium")
+        else:
+            if journal is not None:
+                journal.to_csv(output_path)
+            else:
+                df.to_csv(output_path, index=False, encoding="utf-8")
+            return df
+
+    if engine == "pool" or journal is not None:
+        from .driver_pool import run_driver_pool  # driver_pool imports this module
+
+        return run_driver_pool(workers=workers if engine == "pool" else 1, journal=journal, output_path=output_path)
+
+    return selenium_automation(output_path)
+
+
+def check_records(df: pd.DataFrame, max_issue_share: float = MAX_ISSUE_SHARE) -> None:
+    """
+    Checks that an HTTP fetch actually extracted the schools, before its records overwrite the
+    output.
+    Raises:
+        ValueError: If there are no records, or more than `max_issue_share` of them are issues.
+    """
+
+    issues = int(df["issue"].notna().sum()) if "issue" in df.columns else 0
+    if df.empty or issues > max_issue_share * len(df):
+        raise ValueError(f"{issues} of {len(df)} fetched records are issues")
+
+
+def selenium_automation(output_path: str = "data/school_data.csv") -> pd.DataFrame:
     """
     Automates the process of scraping school data from the GHSA school directory website.
     This function uses Selenium WebDriver to interact with the website, selects schools
     from a dropdown menu, extracts data from a dynamically loaded table, and saves the
     data into a CSV file. The extracted data is also returned as a pandas DataFrame.
+    Args:
+        output_path (str, optional): CSV file to write. Defaults to "data/school_data.csv".
     Returns:
         pd.DataFrame: A DataFrame containing the scraped school data.
     Raises:
@@ -26,18 +210,15 @@ def automation() -> pd.DataFrame:
     Notes:
         - The function expects a file named "school_names.txt" in the "data/" directory,
           containing the names of schools to be selected from the dropdown menu.
-        - The resulting CSV file is saved in the "data/" directory as "school_data.csv".
+        - The resulting CSV file is saved to `output_path` ("data/school_data.csv" by default).
         - The function runs the browser in headless mode by default.
     """
     
     # Set up Selenium WebDriver
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")  # Remove to see browser actions
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    driver = create_driver()
 
     # Open the page
-    driver.get("https://www.ghsa.net/school-directory")
+    driver.get(DIRECTORY_URL)
 
     # Wait for the dropdown to load
     wait = WebDriverWait(driver, 10)
@@ -60,23 +241,25 @@ def automation() -> pd.DataFrame:
         select_element.send_keys(Keys.ENTER)
 
         # Wait until the table with class 'directory-table' loads
-        table_element = wait.until(EC.presence_of_element_located((By.CLASS_NAME, "directory-table")))
+        with metrics.timer("wait_for_table"):
+            table_element = wait.until(EC.presence_of_element_located((By.CLASS_NAME, "directory-table")))
 
         # Re-locate the element just before parsing it to avoid stale element
         table_element = driver.find_element(By.CLASS_NAME, "directory-table")
 
-        # Parse the table HTML with BeautifulSoup
-        soup = BeautifulSoup(table_element.get_attribute("outerHTML"), "html.parser")
+        with metrics.timer("parse"):
+            # Parse the table HTML with BeautifulSoup
+            soup = BeautifulSoup(table_element.get_attribute("outerHTML"), "html.parser")
 
-        # Extract the data from the table
-        per_school_data = get_data(soup)
+            # Extract the data from the table
+            per_school_data = get_data(soup)
         
         data.append(per_school_data)
         
     df = pd.DataFrame(data)
     
     # Save the DataFrame as a CSV file in the data/ directory
-    df.to_csv("data/school_data.csv", index=False, encoding="utf-8")
+    df.to_csv(output_path, index=False, encoding="utf-8")
     
     # Quit the driver
     driver.quit()